@@ -11,6 +11,7 @@ from scraper.models import (
     IntegrationConsumption,
 )
 from scraper.utils.models.base import ExtendedActivatorModel
+from scraper.utils.models.scraper_configuration import bump_configuration_versions
 
 
 class IntegrationConsumptionInline(admin.StackedInline):
@@ -143,26 +144,27 @@ class ScraperConfigurationAdmin(admin.ModelAdmin):
 
     @admin.action(description=_("Start the related scraping algorithms"))
     def start_scraping(self, request, queryset):
-        from scraper.tasks import scraping_dispatcher
+        from scraper.utils.tasks.scheduler import schedule_now
 
+        # The scheduler picks up the started configurations on its next refresh.
         queryset.update(status=ScraperConfiguration.ACTIVE_STATUS)
-        resources_pk = queryset.values_list("resource__pk", flat=True)
-        for resource_pk in resources_pk:
-            scraping_dispatcher.apply_async(args=(resource_pk,))
+        bump_configuration_versions(queryset.values_list("scraper_name", flat=True))
+        num_started = schedule_now(queryset)
         self.message_user(
             request,
             ngettext(
                 _("%d scraper algorithm has been successfully started."),
                 _("%d scraper algorithms have been successfully started."),
-                len(resources_pk),
+                num_started,
             )
-            % len(resources_pk),
+            % num_started,
             messages.SUCCESS,
         )
 
     @admin.action(description=_("Halt the related scraping algorithms"))
     def stop_scraping(self, request, queryset):
         num_inactivated = queryset.update(status=ExtendedActivatorModel.INACTIVE_STATUS)
+        bump_configuration_versions(queryset.values_list("scraper_name", flat=True))
         self.message_user(
             request,
             ngettext(
@@ -0,0 +1,73 @@
+import hashlib
+from typing import Optional
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from scraper.utils.models.scraped_data import get_scraped_data_version
+
+RESPONSE_CACHE_KEY_PREFIX = "scraper:api:response"
+
+
+class ScrapedDataResponseCacheMixin:
+    # The responses of the cached actions are kept in the cache until the scraped data
+    # they could contain changes, which is tracked by the versions of the scraped data.
+    cached_actions = ("list", "retrieve")
+    resource_query_param = "resource"
+
+    def get_response_cache_timeout(self) -> int:
+        from django.conf import settings
+
+        return getattr(settings, "API_CACHE", {}).get("TIMEOUT", 300)
+
+    def get_cache_resource_id(self, request) -> Optional[int]:
+        # The responses limited to a resource are invalidated only by its changes.
+        try:
+            return int(request.query_params[self.resource_query_param])
+        except (KeyError, ValueError):
+            return None
+
+    def get_response_cache_key(self, request, *args, **kwargs) -> str:
+        version = get_scraped_data_version(self.get_cache_resource_id(request))
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.sha1(
+            f"{request.get_host()}{request.path}?{query}:{version}".encode()
+        ).hexdigest()
+        return f"{RESPONSE_CACHE_KEY_PREFIX}:{self.basename}:{self.action}:{digest}"
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request, *args, **kwargs)
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entry = {
+                "data": response.data,
+                "etag": quote_etag(key.rsplit(":", 1)[-1]),
+                "last_modified": int(timezone.now().timestamp()),
+            }
+            cache.set(key, entry, timeout=self.get_response_cache_timeout())
+        return get_conditional_response(
+            request,
+            etag=entry["etag"],
+            last_modified=entry["last_modified"],
+            response=Response(
+                entry["data"],
+                headers={
+                    "ETag": entry["etag"],
+                    "Last-Modified": http_date(entry["last_modified"]),
+                },
+            ),
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
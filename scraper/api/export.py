@@ -0,0 +1,21 @@
+from collections.abc import Iterator
+
+from django.db.models import QuerySet
+
+from scraper.utils.tasks.payload import encode_json
+
+EXPORT_FIELDS = ("id", "resource_id", "natural_key", "data", "created", "modified")
+
+
+def iter_json_lines(queryset: QuerySet, chunk_size: int) -> Iterator[bytes]:
+    # The rows are read with a server-side cursor and written in blocks of the chunk size,
+    # so neither the queryset nor the response is held in the memory.
+    rows = queryset.order_by("created", "id").values(*EXPORT_FIELDS)
+    block = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        block.append(encode_json(row))
+        if len(block) == chunk_size:
+            yield b"\n".join(block) + b"\n"
+            block = []
+    if block:
+        yield b"\n".join(block) + b"\n"
@@ -0,0 +1,92 @@
+import base64
+import dataclasses
+import time
+from typing import Optional
+
+from rest_framework import serializers
+from rest_framework.permissions import DjangoModelPermissions
+
+from scraper.models import Integration, FeedEntry
+from scraper.utils.models.integration import FeedPosition, get_feed, get_feed_version
+
+
+@dataclasses.dataclass(frozen=True)
+class FeedSettings:
+    default_limit: int = 100
+    max_limit: int = 500
+    # The longest time a request waits for the new items, in seconds.
+    max_wait: float = 10
+    poll_interval: float = 1
+
+    @classmethod
+    def from_settings(cls) -> "FeedSettings":
+        from django.conf import settings
+
+        options = getattr(settings, "INTEGRATION_FEED", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+
+def encode_position(position: FeedPosition) -> str:
+    return base64.urlsafe_b64encode(f"feed|{position}".encode()).decode()
+
+
+def decode_position(cursor: str) -> FeedPosition:
+    try:
+        prefix, position = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if prefix != "feed":
+            raise ValueError
+        return int(position)
+    except (ValueError, UnicodeError):
+        raise serializers.ValidationError("The cursor is invalid.")
+
+
+class IntegrationFeedPermission(DjangoModelPermissions):
+    # Reading the feed takes the view permission of the integrations,
+    # acknowledging it the change one, since it moves the position of the integration.
+    perms_map = DjangoModelPermissions.perms_map | {
+        "GET": ["%(app_label)s.view_%(model_name)s"],
+        "HEAD": ["%(app_label)s.view_%(model_name)s"],
+        "POST": ["%(app_label)s.change_%(model_name)s"],
+    }
+
+
+class FeedCursorField(serializers.CharField):
+    def to_internal_value(self, data) -> FeedPosition:
+        return decode_position(super().to_internal_value(data))
+
+
+class FeedQuerySerializer(serializers.Serializer):
+    cursor = FeedCursorField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1)
+    wait = serializers.FloatField(required=False, min_value=0)
+
+
+class FeedAckSerializer(serializers.Serializer):
+    cursor = FeedCursorField()
+
+
+def wait_for_feed(
+    integration: Integration,
+    position: Optional[FeedPosition],
+    limit: int,
+    wait: float,
+    settings: FeedSettings,
+) -> list[FeedEntry]:
+    # The request holds its server thread while it waits, so the wait is capped.
+    # The feed is read again only when some entries have been appended to it,
+    # which is told by the version of the feed of the topic kept in the cache.
+    deadline = time.monotonic() + min(wait, settings.max_wait)
+    version = get_feed_version(integration.topic_id)
+    entries = get_feed(integration, position, limit)
+    while not entries and time.monotonic() < deadline:
+        time.sleep(min(settings.poll_interval, max(deadline - time.monotonic(), 0)))
+        if (current_version := get_feed_version(integration.topic_id)) != version:
+            version = current_version
+            entries = get_feed(integration, position, limit)
+    return entries
@@ -0,0 +1,61 @@
+import json
+
+import django_filters
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from scraper.models import ScrapedData, IntegrationConsumption
+from scraper.utils.models.misc import get_queryset
+
+
+class ScrapedDataContainmentFilter(BaseFilterBackend):
+    # Both ?data={"location": "Kraków"} and ?data.location=Kraków are containment
+    # lookups, since only these are served by the GIN (jsonb_path_ops) index on the data.
+    data_param = "data"
+    key_param_prefix = "data."
+
+    def get_containment(self, request) -> dict:
+        containment = {}
+        if data := request.query_params.get(self.data_param):
+            try:
+                containment = json.loads(data)
+            except ValueError:
+                containment = None
+            if not isinstance(containment, dict):
+                raise ValidationError(
+                    {self.data_param: "The value must be a JSON object."}
+                )
+        for param, value in request.query_params.items():
+            if param.startswith(self.key_param_prefix):
+                if key := param.removeprefix(self.key_param_prefix):
+                    containment[key] = value
+        return containment
+
+    def filter_queryset(self, request, queryset, view):
+        if containment := self.get_containment(request):
+            return queryset.filter(data__contains=containment)
+        return queryset
+
+
+class ScrapedDataFilterSet(django_filters.FilterSet):
+    # Each filter is served by an index of the scraped data or the consumptions,
+    # the ids are not validated against the database to save a query per filter.
+    resource = django_filters.NumberFilter(field_name="resource_id")
+    topic = django_filters.NumberFilter(field_name="resource__topic_id")
+    created = django_filters.IsoDateTimeFromToRangeFilter()
+    modified = django_filters.IsoDateTimeFromToRangeFilter()
+    not_consumed_by = django_filters.NumberFilter(method="filter_not_consumed_by")
+
+    class Meta:
+        model = ScrapedData
+        fields = ("resource", "topic", "created", "modified", "not_consumed_by")
+
+    def filter_not_consumed_by(self, queryset, name, value):
+        return queryset.filter(
+            ~Exists(
+                get_queryset(IntegrationConsumption).filter(
+                    integration_id=value, scraped_data_id=OuterRef("pk")
+                )
+            )
+        )
@@ -0,0 +1,88 @@
+from typing import Optional
+
+from django.db.models import F, Field, Func, QuerySet, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+
+
+class RowValue(Func):
+    # Compared column by column, so (created, id) < (%s, %s) is a single range
+    # of the (created, id) index.
+    function = "ROW"
+    output_field = Field()
+
+
+class KeysetPagination(CursorPagination):
+    # The pages are sliced by the position of their last row in the (created, id) order,
+    # so no page needs the rows before it to be skipped or counted.
+    ordering = ("-created", "-id")
+    page_size_query_param = "page_size"
+
+    def __init__(self):
+        from django.conf import settings
+
+        options = getattr(settings, "API_PAGINATION", {})
+        self.page_size = options.get("PAGE_SIZE", 50)
+        self.max_page_size = options.get("MAX_PAGE_SIZE", 500)
+
+    @staticmethod
+    def encode_position(instance) -> str:
+        return f"{instance.created.isoformat()}|{instance.pk}"
+
+    def decode_position(self, position: str) -> tuple:
+        try:
+            created, pk = position.split("|")
+            created = parse_datetime(created)
+            if created is None:
+                raise ValueError
+            return created, int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def filter_after(
+        self, queryset: QuerySet, position: str, reverse: bool
+    ) -> QuerySet:
+        created, pk = self.decode_position(position)
+        # The rows following the position in the descending order, or preceding it.
+        lookup = GreaterThan if reverse else LessThan
+        return queryset.filter(
+            lookup(RowValue(F("created"), F("id")), RowValue(Value(created), Value(pk)))
+        )
+
+    def paginate_queryset(self, queryset, request, view=None) -> Optional[list]:
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        queryset = queryset.order_by(
+            *(("created", "id") if reverse else ("-created", "-id"))
+        )
+        if self.cursor is not None and self.cursor.position is not None:
+            queryset = self.filter_after(queryset, self.cursor.position, reverse)
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        position = self.encode_position(self.page[-1])
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+        position = self.encode_position(self.page[0])
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
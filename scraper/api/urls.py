@@ -1,8 +1,9 @@
 from rest_framework import routers
 
-from scraper.api.views import ScrapedDataViewSet
+from scraper.api.views import ScrapedDataViewSet, IntegrationFeedViewSet
 
 router = routers.DefaultRouter()
 router.register(r"scraped-data", ScrapedDataViewSet)
+router.register(r"integrations", IntegrationFeedViewSet)
 
 urlpatterns = router.urls
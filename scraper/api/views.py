@@ -1,15 +1,40 @@
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
 from rest_flex_fields import is_expanded
 from rest_flex_fields.views import FlexFieldsMixin
-from rest_framework.viewsets import ReadOnlyModelViewSet
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.viewsets import ReadOnlyModelViewSet, GenericViewSet
 
+from scraper.api.cache import ScrapedDataResponseCacheMixin
+from scraper.api.export import iter_json_lines
+from scraper.api.feed import (
+    FeedAckSerializer,
+    FeedQuerySerializer,
+    FeedSettings,
+    IntegrationFeedPermission,
+    encode_position,
+    wait_for_feed,
+)
+from scraper.api.filters import ScrapedDataContainmentFilter, ScrapedDataFilterSet
+from scraper.api.pagination import KeysetPagination
 from scraper.api.serializers import ScrapedDataSerializer
-from scraper.models import ScrapedData
+from scraper.models import ScrapedData, Integration
+from scraper.utils.models.integration import acknowledge_feed
 from scraper.utils.models.misc import get_queryset
 
 
-class ScrapedDataViewSet(FlexFieldsMixin, ReadOnlyModelViewSet):
+class ScrapedDataViewSet(
+    ScrapedDataResponseCacheMixin, FlexFieldsMixin, ReadOnlyModelViewSet
+):
     queryset = get_queryset(ScrapedData)
     serializer_class = ScrapedDataSerializer
+    filter_backends = (DjangoFilterBackend, ScrapedDataContainmentFilter)
+    filterset_class = ScrapedDataFilterSet
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         queryset = get_queryset(ScrapedData)
@@ -18,3 +43,79 @@ class ScrapedDataViewSet(FlexFieldsMixin, ReadOnlyModelViewSet):
         if is_expanded(self.request, "topic"):
             queryset = queryset.select_related("resource__topic")
         return queryset
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        from django.conf import settings
+
+        queryset = self.filter_queryset(get_queryset(ScrapedData))
+        chunk_size = getattr(settings, "API_EXPORT", {}).get("CHUNK_SIZE", 2000)
+        content = iter_json_lines(queryset, chunk_size)
+        compress = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        response = StreamingHttpResponse(
+            compress_sequence(content) if compress else content,
+            content_type="application/x-ndjson",
+        )
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class IntegrationFeedViewSet(GenericViewSet):
+    # The pull integrations read the scraped data of their topic instead of
+    # having it posted to their hook urls, and acknowledge it in batches.
+    queryset = get_queryset(Integration).filter(
+        status=Integration.ACTIVE_STATUS,
+        delivery_mode=Integration.DeliveryModeChoices.PULL,
+    )
+    serializer_class = ScrapedDataSerializer
+    permission_classes = (IntegrationFeedPermission,)
+    # The long polling clients send a request whenever the previous one returns,
+    # so the feed has its own rate instead of the daily ones of the other views.
+    throttle_classes = (ScopedRateThrottle,)
+    throttle_scope = "integration_feed"
+
+    @action(detail=True, methods=["get"])
+    def feed(self, request, pk=None):
+        integration = self.get_object()
+        query = FeedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        settings = FeedSettings.from_settings()
+        position = query.validated_data.get("cursor", integration.feed_position)
+        entries = wait_for_feed(
+            integration,
+            position,
+            limit=min(
+                query.validated_data.get("limit", settings.default_limit),
+                settings.max_limit,
+            ),
+            wait=query.validated_data.get("wait", 0),
+            settings=settings,
+        )
+        if entries:
+            position = entries[-1].pk
+        return Response(
+            {
+                "cursor": None if position is None else encode_position(position),
+                "results": self.get_serializer(
+                    [entry.scraped_data for entry in entries], many=True
+                ).data,
+            }
+        )
+
+    @action(detail=True, methods=["post"])
+    def ack(self, request, pk=None):
+        integration = self.get_object()
+        serializer = FeedAckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        acknowledged, position = acknowledge_feed(
+            integration,
+            serializer.validated_data["cursor"],
+            limit=FeedSettings.from_settings().max_limit,
+        )
+        # The client acknowledges again from the returned cursor
+        # if it is behind the one it has sent.
+        return Response(
+            {"acknowledged": acknowledged, "cursor": encode_position(position)}
+        )
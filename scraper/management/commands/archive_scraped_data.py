@@ -0,0 +1,45 @@
+import dataclasses
+
+from django.core.management import BaseCommand
+
+from scraper.models import Resource
+from scraper.utils.models.misc import get_queryset
+from scraper.utils.models.retention import (
+    ArchiveSettings,
+    get_expired_buckets,
+    retire_bucket,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the monthly buckets of the scraped data older than the retention "
+        "of their resources to compressed JSON Lines files and deletes them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--directory", help="Where the archives are written to, see the settings."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only show the buckets which would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        settings = ArchiveSettings.from_settings()
+        if options["directory"]:
+            settings = dataclasses.replace(settings, directory=options["directory"])
+        resources = get_queryset(Resource).filter(retention_days__isnull=False)
+        for resource in resources:
+            for bucket in get_expired_buckets(resource):
+                label = f"{resource.title} ({bucket.month:%Y-%m}): {bucket.rows} rows"
+                if options["dry_run"]:
+                    self.stdout.write(f"Would archive {label}")
+                    continue
+                paths, deleted = retire_bucket(bucket, settings)
+                self.stdout.write(
+                    f"Archived {label} to {', '.join(map(str, paths))}, "
+                    f"deleted {deleted}."
+                )
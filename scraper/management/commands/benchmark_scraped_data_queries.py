@@ -0,0 +1,154 @@
+import re
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from scraper.api.filters import ScrapedDataFilterSet
+from scraper.models import ScrapedData, Topic, Resource, Integration
+from scraper.utils.models.misc import get_default_manager, get_queryset
+
+LOCATIONS = ("Kraków", "Warszawa", "Wrocław", "Poznań", "Gdańsk", "Łódź", "Lublin")
+
+# The rows are generated by the database itself, a few millions take seconds to insert.
+INSERT_SYNTHETIC_ROWS = """
+INSERT INTO scraper_scrapeddata (created, modified, resource_id, data, content_hash)
+SELECT
+    now() - make_interval(secs => i),
+    now() - make_interval(secs => i),
+    (%(resources)s)[1 + i %% cardinality(%(resources)s)],
+    jsonb_build_object(
+        'header', 'Laptop ' || i,
+        'location', (%(locations)s)[1 + i %% cardinality(%(locations)s)] || ' - ' || i %% 1000,
+        'price', (i %% 5000) || ' zł'
+    ),
+    ''
+FROM generate_series(1, %(rows)s) AS i
+"""
+
+INDEX_PATTERN = re.compile(r"Index(?: Only)? Scan (?:Backward )?(?:using|on) (\w+)")
+SEQUENTIAL_SCAN_PATTERN = re.compile(r"Seq Scan on scraper_scrapeddata\b")
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the scraped data with synthetic rows and shows the query plans "
+        "of the filters served by its indexes. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=3_000_000)
+        parser.add_argument("--resources", type=int, default=10)
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if a query plan scans the scraped data sequentially.",
+        )
+
+    @staticmethod
+    def filter(**params):
+        # The API filters are applied the way the viewset applies them.
+        query = QueryDict(mutable=True)
+        query.update({name: str(value) for name, value in params.items()})
+        return ScrapedDataFilterSet(
+            data=query, queryset=get_queryset(ScrapedData)
+        ).qs.order_by("-created", "-id")[:50]
+
+    def get_queries(self, resource: Resource, integration: Integration):
+        queryset = get_queryset(ScrapedData)
+        an_hour_ago = (timezone.now() - timedelta(hours=1)).isoformat()
+        return {
+            "filter by resource": self.filter(resource=resource.pk),
+            "filter by topic": self.filter(topic=resource.topic_id),
+            "filter by created range": self.filter(created_after=an_hour_ago),
+            "filter by modified range": self.filter(modified_after=an_hour_ago),
+            "filter not consumed by an integration": self.filter(
+                not_consumed_by=integration.pk, resource=resource.pk
+            ),
+            "data contains a location": queryset.filter(
+                data__contains={"location": f"{LOCATIONS[1]} - 8"}
+            ),
+            "data contains a header and a price": queryset.filter(
+                data__contains={"header": "Laptop 4242", "price": "4242 zł"}
+            ),
+            "latest created of a resource": queryset.filter(resource=resource).order_by(
+                "-created"
+            )[:50],
+            "latest modified of a resource": queryset.filter(
+                resource=resource
+            ).order_by("-modified")[:50],
+        }
+
+    def explain(self, name: str, queryset) -> str:
+        started = time.perf_counter()
+        plan = queryset.explain(analyze=True)
+        elapsed = time.perf_counter() - started
+        indexes = sorted(set(INDEX_PATTERN.findall(plan)))
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(f"{name}: {elapsed * 1000:.1f}ms, ")
+            + (
+                self.style.SUCCESS(f"uses {', '.join(indexes)}")
+                if indexes
+                else self.style.ERROR("uses no index")
+            )
+        )
+        self.stdout.write(plan)
+        return plan
+
+    def handle(self, *args, **options):
+        using = router.db_for_write(ScrapedData)
+        connection = connections[using]
+        if connection.vendor != "postgresql":
+            raise CommandError("The benchmark requires a Postgres database.")
+        try:
+            with transaction.atomic(using=using):
+                topic = get_default_manager(Topic).create(title="Benchmark")
+                integration = get_default_manager(Integration).create(
+                    topic=topic, title="Benchmark", hook_url="https://example.com/"
+                )
+                resources = get_default_manager(Resource).bulk_create(
+                    [
+                        Resource(
+                            topic=topic,
+                            title=f"Benchmark {number}",
+                            url="https://www.olx.pl/",
+                        )
+                        for number in range(options["resources"])
+                    ]
+                )
+                started = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        INSERT_SYNTHETIC_ROWS,
+                        {
+                            "resources": [resource.pk for resource in resources],
+                            "locations": list(LOCATIONS),
+                            "rows": options["rows"],
+                        },
+                    )
+                    cursor.execute("ANALYZE scraper_scrapeddata")
+                self.stdout.write(
+                    f"Inserted {options['rows']} rows "
+                    f"in {time.perf_counter() - started:.1f}s."
+                )
+                sequential_scans = [
+                    name
+                    for name, queryset in self.get_queries(
+                        resources[0], integration
+                    ).items()
+                    if SEQUENTIAL_SCAN_PATTERN.search(self.explain(name, queryset))
+                ]
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Rolled back the synthetic rows.")
+        if options["check"] and sequential_scans:
+            raise CommandError(
+                f"The scraped data is scanned sequentially by: {', '.join(sequential_scans)}"
+            )
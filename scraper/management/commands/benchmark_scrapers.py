@@ -0,0 +1,78 @@
+import time
+from pathlib import Path
+
+from django.core.management import BaseCommand
+
+from scraper.scrapers import LaptopsOLXScraper
+
+LOAD_HTML_SCRIPT = """
+document.open();
+document.write(arguments[0]);
+document.close();
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the pages per second of the static HTML scraping engine "
+        "with the Selenium path of the LaptopsOLXScraper on the recorded listing pages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "pages", nargs="+", type=Path, help="The recorded HTML listing pages."
+        )
+        parser.add_argument("--iterations", type=int, default=10)
+        parser.add_argument(
+            "--base-url",
+            default="https://www.olx.pl/",
+            help="The url the relative links of the pages are resolved against.",
+        )
+        parser.add_argument(
+            "--skip-selenium",
+            action="store_true",
+            help="Do not benchmark the Selenium path, e.g. if the grid is not available.",
+        )
+
+    def report(self, name: str, pages: int, items: int, elapsed: float):
+        self.stdout.write(
+            f"{name}: {pages} pages, {items} items in {elapsed:.3f}s - "
+            f"{pages / elapsed:.2f} pages/s"
+        )
+
+    def benchmark_static(self, pages: list[str], iterations: int, base_url: str):
+        from scraper.scrapers.static import parse_document
+
+        container = LaptopsOLXScraper.offer_container
+        fields = LaptopsOLXScraper.offer_fields
+        items = 0
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for html in pages:
+                parsed, _ = parse_document(html, base_url, container, fields)
+                items += len(parsed)
+        self.report(
+            "static", len(pages) * iterations, items, time.perf_counter() - started
+        )
+
+    def benchmark_selenium(self, pages: list[str], iterations: int):
+        scraper = LaptopsOLXScraper()
+        items = 0
+        with scraper.leased_driver() as driver:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                for html in pages:
+                    driver.execute_script(LOAD_HTML_SCRIPT, html)
+                    items += len(
+                        scraper.extract(
+                            driver, scraper.offer_container, scraper.offer_fields
+                        )
+                    )
+            elapsed = time.perf_counter() - started
+        self.report("selenium", len(pages) * iterations, items, elapsed)
+
+    def handle(self, *args, **options):
+        pages = [path.read_text() for path in options["pages"]]
+        self.benchmark_static(pages, options["iterations"], options["base_url"])
+        if not options["skip_selenium"]:
+            self.benchmark_selenium(pages, options["iterations"])
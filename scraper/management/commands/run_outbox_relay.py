@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from scraper.utils.tasks.outbox import OutboxRelay
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the relay publishing the deliveries of the scraped data from the outbox. "
+        "Several relays can be run, each drains the entries the others have not locked."
+    )
+
+    def handle(self, *args, **options):
+        try:
+            OutboxRelay().run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("The outbox relay has been stopped.")
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from scraper.utils.tasks.scheduler import ScrapingScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the scheduler releasing the due scraping steps. "
+        "Several schedulers can be run, only the elected leader releases the steps."
+    )
+
+    def handle(self, *args, **options):
+        try:
+            ScrapingScheduler().run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("The scheduler has been stopped.")
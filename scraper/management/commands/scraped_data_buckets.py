@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from scraper.models import Resource
+from scraper.utils.models.misc import get_queryset
+from scraper.utils.models.retention import get_buckets
+
+
+class Command(BaseCommand):
+    help = "Shows the number of rows and the size of the scraped data per resource and month."
+
+    def handle(self, *args, **options):
+        titles = dict(get_queryset(Resource).values_list("pk", "title"))
+        for bucket in get_buckets():
+            size = "" if bucket.size is None else f", {filesizeformat(bucket.size)}"
+            self.stdout.write(
+                f"{titles.get(bucket.resource_id)} ({bucket.month:%Y-%m}): "
+                f"{bucket.rows} rows{size}, "
+                f"from {bucket.oldest:%Y-%m-%d} to {bucket.newest:%Y-%m-%d}"
+            )
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from scraper.utils.tasks.priorities import PRIORITY_QUEUES, get_queue_depths
+from scraper.models import Resource
+
+
+class Command(BaseCommand):
+    help = "Shows the number of the scraping steps waiting in each priority queue."
+
+    def handle(self, *args, **options):
+        depths = get_queue_depths()
+        for priority, queue in PRIORITY_QUEUES.items():
+            label = Resource.PriorityChoices(priority).label
+            self.stdout.write(f"{label} ({queue}): {depths[queue]}")
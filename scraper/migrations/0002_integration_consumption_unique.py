@@ -0,0 +1,33 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:44
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicated_consumptions(apps, schema_editor):
+    IntegrationConsumption = apps.get_model("scraper", "IntegrationConsumption")
+    manager = IntegrationConsumption._default_manager
+    first_consumptions = (
+        manager.values("integration", "scraped_data")
+        .annotate(first_pk=Min("pk"))
+        .values("first_pk")
+    )
+    manager.exclude(pk__in=first_consumptions).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicated_consumptions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="integrationconsumption",
+            constraint=models.UniqueConstraint(
+                fields=("integration", "scraped_data"),
+                name="unique_integration_consumption",
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0002_integration_consumption_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scrapeddata",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="A hash of the data used to detect the changed items.",
+                max_length=64,
+                verbose_name="content hash",
+            ),
+        ),
+        migrations.AddField(
+            model_name="scrapeddata",
+            name="natural_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Identifies the scraped item within the resource.",
+                max_length=512,
+                null=True,
+                verbose_name="natural key",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="scrapeddata",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("natural_key__isnull", False)),
+                fields=("resource", "natural_key"),
+                name="unique_scraped_data_natural_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0003_scraped_data_natural_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scraperconfiguration",
+            name="next_run_at",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="When the scheduler is going to release the next scraping step.",
+                null=True,
+                verbose_name="next run at",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0004_scraper_configuration_next_run_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resource",
+            name="rate_limit",
+            field=models.FloatField(
+                blank=True,
+                help_text="The number of the requests per second sent to the resource's domain. The limit configured for the domain is used if not set.",
+                null=True,
+                verbose_name="rate limit",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0005_resource_rate_limit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scraperconfiguration",
+            name="lease_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="Until when the running scraping step holds the lease.",
+                null=True,
+                verbose_name="lease expires at",
+            ),
+        ),
+        migrations.AddField(
+            model_name="scraperconfiguration",
+            name="lease_token",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Incremented whenever a scraping step acquires the lease.",
+                verbose_name="lease token",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0006_scraper_configuration_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resource",
+            name="retention_days",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="For how many days the scraped data is kept before it gets archived. The scraped data is kept forever if not set.",
+                null=True,
+                verbose_name="retention days",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:58
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0007_resource_retention"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="scrapeddata",
+            index=models.Index(
+                fields=["resource", "created"], name="scraped_data_resource_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scrapeddata",
+            index=models.Index(
+                fields=["resource", "-modified"], name="scraped_data_resource_modified"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scrapeddata",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["data"],
+                name="scraper_scrapeddata_data_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0008_scraped_data_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="scrapeddata",
+            index=models.Index(
+                fields=["created", "id"], name="scraped_data_created_id"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0009_scraped_data_created_id_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="scrapeddata",
+            index=models.Index(fields=["modified"], name="scraped_data_modified"),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0010_scraped_data_modified_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="integration",
+            name="delivery_mode",
+            field=models.SmallIntegerField(
+                choices=[(0, "Push"), (1, "Pull")],
+                default=0,
+                help_text="The scraped data is posted to the hook url of the push integrations, the pull integrations read it from their feed.",
+                verbose_name="delivery mode",
+            ),
+        ),
+        migrations.AddField(
+            model_name="integration",
+            name="feed_position_id",
+            field=models.PositiveBigIntegerField(
+                blank=True,
+                editable=False,
+                help_text="The id of the last acknowledged feed item.",
+                null=True,
+                verbose_name="feed position id",
+            ),
+        ),
+        migrations.AddField(
+            model_name="integration",
+            name="feed_position_modified",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="The modification time of the last acknowledged feed item.",
+                null=True,
+                verbose_name="feed position modified",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="integration",
+            name="hook_url",
+            field=models.URLField(
+                blank=True,
+                help_text="This url will be used to post scrapped data.",
+                verbose_name="resource url",
+            ),
+        ),
+    ]
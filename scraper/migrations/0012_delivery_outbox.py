@@ -0,0 +1,50 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0011_integration_feed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeliveryOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    django_extensions.db.fields.CreationDateTimeField(
+                        auto_now_add=True, verbose_name="created"
+                    ),
+                ),
+                (
+                    "scraped_data",
+                    models.ForeignKey(
+                        help_text="The scraped data waiting to be delivered.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="outbox_entries",
+                        related_query_name="outbox_entry",
+                        to="scraper.scrapeddata",
+                        verbose_name="scrapped data",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Delivery Outbox Entry",
+                "verbose_name_plural": "Delivery Outbox",
+            },
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:06
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0012_delivery_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="integration",
+            name="batch_max_bytes",
+            field=models.PositiveIntegerField(
+                default=1048576,
+                help_text="The approximate maximal size of the scraped data sent at once.",
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="batch max bytes",
+            ),
+        ),
+        migrations.AddField(
+            model_name="integration",
+            name="batch_max_items",
+            field=models.PositiveIntegerField(
+                default=500,
+                help_text="The maximal number of the scraped data items sent at once.",
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="batch max items",
+            ),
+        ),
+        migrations.AddField(
+            model_name="integration",
+            name="batch_max_latency",
+            field=models.FloatField(
+                default=10,
+                help_text="For how many seconds the scraped data can wait for the batch to fill up.",
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="batch max latency",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PendingDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    django_extensions.db.fields.CreationDateTimeField(
+                        auto_now_add=True, verbose_name="created"
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveIntegerField(
+                        help_text="The approximate size of the scraped data.",
+                        verbose_name="size",
+                    ),
+                ),
+                (
+                    "integration",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_deliveries",
+                        related_query_name="pending_delivery",
+                        to="scraper.integration",
+                        verbose_name="integration",
+                    ),
+                ),
+                (
+                    "scraped_data",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_deliveries",
+                        related_query_name="pending_delivery",
+                        to="scraper.scrapeddata",
+                        verbose_name="scrapped data",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Pending Delivery",
+                "verbose_name_plural": "Pending Deliveries",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="pendingdelivery",
+            constraint=models.UniqueConstraint(
+                fields=("integration", "scraped_data"), name="unique_pending_delivery"
+            ),
+        ),
+    ]
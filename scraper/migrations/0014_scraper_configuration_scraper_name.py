@@ -0,0 +1,24 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0013_integration_batching"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="scraperconfiguration",
+            name="scraper_name",
+            field=models.CharField(
+                choices=[("scraper:laptopsolxscraper", "scraper.LaptopsOLXScraper")],
+                help_text="A name of scraping algorithm to use.",
+                max_length=128,
+                unique=True,
+                verbose_name="A scraper name",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0014_scraper_configuration_scraper_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scraperconfiguration",
+            name="released_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When the scheduler has released a step which has not started yet.",
+                null=True,
+                verbose_name="released at",
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations
+
+# The retention buckets are keyed by the last change of the scraped data,
+# the BRIN index once created on Postgres by 0007 serves no query anymore.
+DROP_CREATED_BRIN_INDEX = "DROP INDEX IF EXISTS scraper_scrapeddata_created_brin"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0015_scraper_configuration_released_at"),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_CREATED_BRIN_INDEX, migrations.RunSQL.noop),
+    ]
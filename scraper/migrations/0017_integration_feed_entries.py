@@ -0,0 +1,109 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+# The scraped data stored so far is fed in the order it used to be, by its last change.
+FILL_FEED = """
+INSERT INTO scraper_feedentry (created, topic_id, scraped_data_id)
+SELECT now(), scraper_resource.topic_id, scraper_scrapeddata.id
+FROM scraper_scrapeddata
+JOIN scraper_resource ON scraper_resource.id = scraper_scrapeddata.resource_id
+ORDER BY scraper_scrapeddata.modified, scraper_scrapeddata.id
+"""
+
+# The integrations keep their place, at the last entry they have acknowledged.
+MOVE_FEED_POSITIONS = """
+UPDATE scraper_integration SET feed_position = (
+    SELECT max(scraper_feedentry.id)
+    FROM scraper_feedentry
+    JOIN scraper_scrapeddata
+        ON scraper_scrapeddata.id = scraper_feedentry.scraped_data_id
+    WHERE scraper_feedentry.topic_id = scraper_integration.topic_id
+    AND (scraper_scrapeddata.modified, scraper_scrapeddata.id)
+        <= (scraper_integration.feed_position_modified, scraper_integration.feed_position_id)
+)
+WHERE scraper_integration.feed_position_modified IS NOT NULL
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0016_drop_scraped_data_created_brin"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="integration",
+            name="feed_position",
+            field=models.PositiveBigIntegerField(
+                blank=True,
+                editable=False,
+                help_text="The id of the last acknowledged feed entry.",
+                null=True,
+                verbose_name="feed position",
+            ),
+        ),
+        migrations.CreateModel(
+            name="FeedEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    django_extensions.db.fields.CreationDateTimeField(
+                        auto_now_add=True, verbose_name="created"
+                    ),
+                ),
+                (
+                    "scraped_data",
+                    models.ForeignKey(
+                        help_text="The scraped data created or changed.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_entries",
+                        related_query_name="feed_entry",
+                        to="scraper.scrapeddata",
+                        verbose_name="scrapped data",
+                    ),
+                ),
+                (
+                    "topic",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_entries",
+                        related_query_name="feed_entry",
+                        to="scraper.topic",
+                        verbose_name="topic",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Feed Entry",
+                "verbose_name_plural": "Feed Entries",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="feedentry",
+            index=models.Index(fields=["topic", "id"], name="feed_entry_topic_id"),
+        ),
+        migrations.RunSQL(FILL_FEED, migrations.RunSQL.noop),
+        migrations.RunSQL(MOVE_FEED_POSITIONS, migrations.RunSQL.noop),
+        migrations.RemoveField(
+            model_name="integration",
+            name="feed_position_id",
+        ),
+        migrations.RemoveField(
+            model_name="integration",
+            name="feed_position_modified",
+        ),
+    ]
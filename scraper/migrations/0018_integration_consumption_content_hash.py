@@ -0,0 +1,35 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+
+# The recorded consumptions are taken for the versions stored now,
+# so the scraped data is not delivered again unless it changes.
+FILL_CONTENT_HASHES = """
+UPDATE scraper_integrationconsumption
+SET content_hash = scraper_scrapeddata.content_hash
+FROM scraper_scrapeddata
+WHERE scraper_scrapeddata.id = scraper_integrationconsumption.scraped_data_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0017_integration_feed_entries"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="integrationconsumption",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="The content hash of the consumed version of the scraped data.",
+                max_length=64,
+                verbose_name="content hash",
+            ),
+        ),
+        migrations.RunSQL(FILL_CONTENT_HASHES, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:42
+
+import django.core.validators
+from django.db import migrations, models
+
+
+# The rates which are not positive could not be applied, the limit of the domain is used.
+CLEAR_RATE_LIMITS = """
+UPDATE scraper_resource SET rate_limit = NULL WHERE rate_limit <= 0
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scraper", "0018_integration_consumption_content_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="resource",
+            name="rate_limit",
+            field=models.FloatField(
+                blank=True,
+                help_text="The number of the requests per second sent to the resource's domain. The limit configured for the domain is used if not set.",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.001)],
+                verbose_name="rate limit",
+            ),
+        ),
+        migrations.RunSQL(CLEAR_RATE_LIMITS, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="resource",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    ("rate_limit__isnull", True), ("rate_limit__gt", 0), _connector="OR"
+                ),
+                name="resource_rate_limit_positive",
+            ),
+        ),
+    ]
@@ -1,3 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.db.models import URLField
 from django_extensions.db.fields import CreationDateTimeField
@@ -48,6 +51,34 @@ class Resource(
             "The priorities define the order in which the resources will be getting scrapped."
         ),
     )
+    rate_limit = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0.001)],
+        verbose_name=_("rate limit"),
+        help_text=_(
+            "The number of the requests per second sent to the resource's domain. "
+            "The limit configured for the domain is used if not set."
+        ),
+    )
+    retention_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("retention days"),
+        help_text=_(
+            "For how many days the scraped data is kept before it gets archived. "
+            "The scraped data is kept forever if not set."
+        ),
+    )
+
+    class Meta(TimeStampedModel.Meta):
+        constraints = [
+            # A rate which is not positive would never produce the tokens of the bucket.
+            models.CheckConstraint(
+                check=models.Q(rate_limit__isnull=True) | models.Q(rate_limit__gt=0),
+                name="resource_rate_limit_positive",
+            )
+        ]
 
 
 class Integration(
@@ -63,10 +94,60 @@ class Integration(
         related_name="integrations",
         related_query_name="integration",
     )
+
+    class DeliveryModeChoices(models.IntegerChoices):
+        PUSH = 0, _("Push")
+        PULL = 1, _("Pull")
+
     hook_url = URLField(
         verbose_name=_("resource url"),
         help_text=_("This url will be used to post scrapped data."),
+        blank=True,
+    )
+    delivery_mode = models.SmallIntegerField(
+        choices=DeliveryModeChoices.choices,
+        default=DeliveryModeChoices.PUSH,
+        verbose_name=_("delivery mode"),
+        help_text=_(
+            "The scraped data is posted to the hook url of the push integrations, "
+            "the pull integrations read it from their feed."
+        ),
     )
+    feed_position = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("feed position"),
+        help_text=_("The id of the last acknowledged feed entry."),
+    )
+    # The scraped data is coalesced into one request to the hook url,
+    # sent once any of the limits is reached.
+    batch_max_items = models.PositiveIntegerField(
+        default=500,
+        validators=[MinValueValidator(1)],
+        verbose_name=_("batch max items"),
+        help_text=_("The maximal number of the scraped data items sent at once."),
+    )
+    batch_max_bytes = models.PositiveIntegerField(
+        default=1024 * 1024,
+        validators=[MinValueValidator(1)],
+        verbose_name=_("batch max bytes"),
+        help_text=_("The approximate maximal size of the scraped data sent at once."),
+    )
+    batch_max_latency = models.FloatField(
+        default=10,
+        validators=[MinValueValidator(0)],
+        verbose_name=_("batch max latency"),
+        help_text=_(
+            "For how many seconds the scraped data can wait for the batch to fill up."
+        ),
+    )
+
+    def clean(self):
+        if self.delivery_mode == self.DeliveryModeChoices.PUSH and not self.hook_url:
+            raise ValidationError(
+                {"hook_url": _("The push integrations require a hook url.")}
+            )
 
 
 class IntegrationConsumption(models.Model):
@@ -85,6 +166,21 @@ class IntegrationConsumption(models.Model):
         related_name="integration_consumptions",
         related_query_name="integration_consumption",
     )
+    content_hash = models.CharField(
+        _("content hash"),
+        help_text=_("The content hash of the consumed version of the scraped data."),
+        max_length=64,
+        blank=True,
+        default="",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("integration", "scraped_data"),
+                name="unique_integration_consumption",
+            )
+        ]
 
 
 class ScrapedData(TimeStampedModel):
@@ -106,6 +202,20 @@ class ScrapedData(TimeStampedModel):
     data = models.JSONField(
         verbose_name=_("data"), help_text=_("The scrapped data."), default=dict
     )
+    natural_key = models.CharField(
+        _("natural key"),
+        help_text=_("Identifies the scraped item within the resource."),
+        max_length=512,
+        null=True,
+        blank=True,
+    )
+    content_hash = models.CharField(
+        _("content hash"),
+        help_text=_("A hash of the data used to detect the changed items."),
+        max_length=64,
+        blank=True,
+        default="",
+    )
 
     @property
     def is_empty(self) -> bool:
@@ -114,6 +224,31 @@ class ScrapedData(TimeStampedModel):
     class Meta:
         verbose_name = _("Scrapped Data")
         verbose_name_plural = verbose_name
+        constraints = [
+            models.UniqueConstraint(
+                fields=("resource", "natural_key"),
+                condition=models.Q(natural_key__isnull=False),
+                name="unique_scraped_data_natural_key",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=("resource", "created"), name="scraped_data_resource_created"
+            ),
+            models.Index(
+                fields=("resource", "-modified"), name="scraped_data_resource_modified"
+            ),
+            # Serves the keyset pagination of the API.
+            models.Index(fields=("created", "id"), name="scraped_data_created_id"),
+            models.Index(fields=("modified",), name="scraped_data_modified"),
+            # The jsonb_path_ops operator class serves only the containment (@>)
+            # lookups, but its index is several times smaller than the jsonb_ops one.
+            GinIndex(
+                fields=["data"],
+                opclasses=["jsonb_path_ops"],
+                name="scraper_scrapeddata_data_gin",
+            ),
+        ]
 
 
 class ScraperConfiguration(
@@ -141,3 +276,108 @@ class ScraperConfiguration(
         unique=True,
         choices=scraper_choices(),
     )
+    next_run_at = models.DateTimeField(
+        _("next run at"),
+        help_text=_("When the scheduler is going to release the next scraping step."),
+        null=True,
+        blank=True,
+        db_index=True,
+    )
+    lease_token = models.PositiveBigIntegerField(
+        _("lease token"),
+        help_text=_("Incremented whenever a scraping step acquires the lease."),
+        default=0,
+        editable=False,
+    )
+    lease_expires_at = models.DateTimeField(
+        _("lease expires at"),
+        help_text=_("Until when the running scraping step holds the lease."),
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    released_at = models.DateTimeField(
+        _("released at"),
+        help_text=_(
+            "When the scheduler has released a step which has not started yet."
+        ),
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+
+class DeliveryOutbox(models.Model):
+    # Written in the transaction storing the scraped data, and drained by the relay
+    # publishing its deliveries, so no committed item is left undelivered.
+    created = CreationDateTimeField(_("created"))
+    scraped_data = models.ForeignKey(
+        ScrapedData,
+        on_delete=models.CASCADE,
+        verbose_name=_("scrapped data"),
+        help_text=_("The scraped data waiting to be delivered."),
+        related_name="outbox_entries",
+        related_query_name="outbox_entry",
+    )
+
+    class Meta:
+        verbose_name = _("Delivery Outbox Entry")
+        verbose_name_plural = _("Delivery Outbox")
+
+
+class FeedEntry(models.Model):
+    # Appended by the outbox relay in the order of the commits, so a reader
+    # which has seen an entry has seen every entry before it.
+    created = CreationDateTimeField(_("created"))
+    topic = models.ForeignKey(
+        Topic,
+        on_delete=models.CASCADE,
+        verbose_name=_("topic"),
+        related_name="feed_entries",
+        related_query_name="feed_entry",
+    )
+    scraped_data = models.ForeignKey(
+        ScrapedData,
+        on_delete=models.CASCADE,
+        verbose_name=_("scrapped data"),
+        help_text=_("The scraped data created or changed."),
+        related_name="feed_entries",
+        related_query_name="feed_entry",
+    )
+
+    class Meta:
+        verbose_name = _("Feed Entry")
+        verbose_name_plural = _("Feed Entries")
+        indexes = [models.Index(fields=("topic", "id"), name="feed_entry_topic_id")]
+
+
+class PendingDelivery(models.Model):
+    # The scraped data waiting for the batch of the integration to be sent.
+    created = CreationDateTimeField(_("created"))
+    integration = models.ForeignKey(
+        Integration,
+        on_delete=models.CASCADE,
+        verbose_name=_("integration"),
+        related_name="pending_deliveries",
+        related_query_name="pending_delivery",
+    )
+    scraped_data = models.ForeignKey(
+        ScrapedData,
+        on_delete=models.CASCADE,
+        verbose_name=_("scrapped data"),
+        related_name="pending_deliveries",
+        related_query_name="pending_delivery",
+    )
+    size = models.PositiveIntegerField(
+        _("size"), help_text=_("The approximate size of the scraped data.")
+    )
+
+    class Meta:
+        verbose_name = _("Pending Delivery")
+        verbose_name_plural = _("Pending Deliveries")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("integration", "scraped_data"),
+                name="unique_pending_delivery",
+            )
+        ]
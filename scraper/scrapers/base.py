@@ -10,6 +10,7 @@ from django.db import transaction
 from django.utils.functional import classproperty, cached_property
 
 from scraper.utils.models.misc import get_object_or_none, get_default_manager
+from scraper.utils.scrapers.ratelimit import get_rate_limiter, Rate
 
 from typing import TYPE_CHECKING
 
@@ -17,7 +18,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from scraper.models import ScrapedData, ScraperConfiguration, Resource
 
-__all__ = ("Scraper", "ScrapeResult")
+__all__ = ("Scraper", "ScrapeResult", "ScrapingStepInProgress", "ScrapingLeaseLost")
 
 
 logger = get_task_logger(__name__)
@@ -27,15 +28,32 @@ logger = get_task_logger(__name__)
 class ScrapeResult:
     data: Union["ScrapedData", Sequence["ScrapedData"]]
     state: dict
+    stats: dict = dataclasses.field(default_factory=dict)
 
     @cached_property
     def is_empty(self) -> bool:
+        # The items skipped as unchanged have still been scraped.
+        if self.stats.get("skipped_unchanged"):
+            return False
         return not self.data if isinstance(self.data, Sequence) else self.data.is_empty
 
 
+class ScrapingStepInProgress(Exception):
+    pass
+
+
+class ScrapingLeaseLost(ScrapingStepInProgress):
+    pass
+
+
 class Scraper(ABC):
     scrape_data_countdown: timedelta = timedelta(minutes=10)
+    # Must be longer than a scraping step, the lease of a crashed step expires after it.
+    step_lease_timeout: timedelta = timedelta(minutes=15)
     app_name = "scraper"
+    # The key of the scraped items' field identifying them within the resource.
+    # The items with a natural key are upserted and only the new or changed ones are delivered.
+    natural_key_field: Optional[str] = None
 
     @staticmethod
     def ensure_configuration(is_atomic: bool = False):
@@ -58,17 +76,24 @@ class Scraper(ABC):
     def scraper_name(cls) -> str:
         return f"{cls.app_name}:{cls.__qualname__.lower()}"
 
-    def __init_subclass__(cls, **kwargs):
+    def __init_subclass__(cls, abstract: bool = False, **kwargs):
         from scraper.scrapers.registry import add_to_registry
 
-        add_to_registry(cls)
+        # The abstract scrapers are the bases for the other ones and cannot be configured.
+        if not abstract:
+            add_to_registry(cls)
         super().__init_subclass__(**kwargs)
 
     def __reload_configuration(self) -> Optional["ScraperConfiguration"]:
-        from scraper.models import ScraperConfiguration
+        from scraper.utils.models.scraper_configuration import (
+            get_configuration_snapshot,
+        )
 
-        self.__configuration = get_object_or_none(
-            ScraperConfiguration, scraper_name=self.scraper_name
+        # The configuration comes from the snapshot cached by the worker,
+        # which is reloaded only if the configuration has changed.
+        snapshot = get_configuration_snapshot(self.scraper_name)
+        self.__configuration = (
+            None if snapshot is None else snapshot.get_configuration()
         )
         return self.__configuration
 
@@ -86,22 +111,74 @@ class Scraper(ABC):
         from scraper.models import ScraperConfiguration
 
         self.__configuration: Optional[ScraperConfiguration] = None
+        self.__lease_token: Optional[int] = None
+        # The writes of a step, opened by the first of them.
+        self.__writes: Optional[contextlib.ExitStack] = None
+        self.__is_writing = False
+        self.stats: dict = {}
+
+    def __begin_writes(self):
+        # The scraped data, its outbox entries and the scraper state are written
+        # in one transaction, which is not held open while the pages are fetched.
+        if self.__writes is not None and not self.__is_writing:
+            self.__writes.enter_context(transaction.atomic())
+            self.__is_writing = True
 
     def build_scraped_data(
         self, data: Union[dict, Sequence[dict]]
     ) -> Union["ScrapedData", Sequence["ScrapedData"]]:
         from scraper.models import ScrapedData
+        from scraper.utils.tasks.outbox import add_to_outbox
+
+        self.__begin_writes()
+        if self.natural_key_field is not None:
+            scraped_data = self.upsert_scraped_data(data)
+            add_to_outbox(scraped_data)
+            return scraped_data
 
         manager = get_default_manager(ScrapedData)
         if isinstance(data, Sequence):
+            from scraper.utils.models.scraped_data import bump_scraped_data_versions
+
             manager.bulk_create(
                 scraped_data := [
                     ScrapedData(resource=self.resource, data=data_point)
                     for data_point in data
                 ]
             )
+            bump_scraped_data_versions((self.resource.pk,))
+            add_to_outbox(scraped_data)
         else:
             scraped_data = manager.create(resource=self.resource, data=data)
+            add_to_outbox((scraped_data,))
+        return scraped_data
+
+    def upsert_scraped_data(
+        self, data: Union[dict, Sequence[dict]]
+    ) -> Sequence["ScrapedData"]:
+        from scraper.utils.models.scraped_data import upsert_scraped_data
+
+        data = data if isinstance(data, Sequence) else (data,)
+        items = [
+            (str(data_point[self.natural_key_field]), data_point)
+            for data_point in data
+            if data_point.get(self.natural_key_field)
+        ]
+        if len(items) < len(data):
+            logger.warning(
+                self.make_log_message(
+                    f"Dropped {len(data) - len(items)} items "
+                    f"without the {self.natural_key_field!r} natural key."
+                )
+            )
+        scraped_data, skipped = upsert_scraped_data(self.resource, items)
+        self.stats["skipped_unchanged"] = skipped
+        logger.info(
+            self.make_log_message(
+                f"Stored {len(scraped_data)} new or changed items, "
+                f"skipped {skipped} unchanged ones."
+            )
+        )
         return scraped_data
 
     @property
@@ -110,10 +187,30 @@ class Scraper(ABC):
         return self.__configuration.state
 
     @state.setter
-    @ensure_configuration(is_atomic=True)
+    @ensure_configuration()
     def state(self, state_data):
         self.__configuration.state = state_data
-        self.__configuration.save(update_fields=("state",))
+        self.__save_configuration("state")
+
+    def __save_configuration(self, *fields: str):
+        from scraper.utils.models.scraper_configuration import (
+            update_fenced,
+            update_configuration_snapshot,
+        )
+
+        if self.__lease_token is None:
+            # The snapshots are invalidated by the signal handlers.
+            self.__configuration.save(update_fields=fields)
+        elif update_fenced(self.__configuration, self.__lease_token, *fields):
+            update_configuration_snapshot(self.__configuration)
+        else:
+            # The writes of the step are rolled back with its transaction,
+            # the step holding the lease now writes its own.
+            raise ScrapingLeaseLost(
+                self.make_log_message(
+                    f"The lease has been taken over, {fields=} have not been saved."
+                )
+            )
 
     @property
     @ensure_configuration()
@@ -124,12 +221,12 @@ class Scraper(ABC):
     def is_active(self) -> bool:
         return self.resource.is_active and self.__configuration.is_active
 
-    @ensure_configuration(is_atomic=True)
+    @ensure_configuration()
     def deactivate(self):
         from scraper.models import ScraperConfiguration
 
         self.__configuration.status = ScraperConfiguration.INACTIVE_STATUS
-        self.__configuration.save(update_fields=("status",))
+        self.__save_configuration("status")
 
     @cached_property
     @ensure_configuration()
@@ -142,11 +239,48 @@ class Scraper(ABC):
     def make_log_message(self, message: str) -> str:
         return f"{self.logger_prefix}{message}"
 
+    @property
+    def rate_limit(self) -> Optional[Rate]:
+        rate_limit = self.resource.rate_limit
+        return None if rate_limit is None else Rate(rate=rate_limit)
+
+    def __record_throttling(self, delay: float):
+        self.stats["rate_limit_wait"] = self.stats.get("rate_limit_wait", 0) + delay
+
+    def throttle(self, url: str):
+        # Waits for the politeness limit of the url's domain, shared by all the workers.
+        self.__record_throttling(get_rate_limiter().wait(url, self.rate_limit))
+
+    async def async_throttle(self, url: str):
+        self.__record_throttling(
+            await get_rate_limiter().async_wait(url, self.rate_limit)
+        )
+
     @abstractmethod
     def scrape(self) -> ScrapeResult:
         ...
 
     def step(self) -> ScrapeResult:
+        from scraper.utils.models.scraper_configuration import (
+            acquire_lease,
+            release_lease,
+        )
+
+        # Only one step of a scraper runs at a time, the duplicated ones are dropped.
+        lease_token = acquire_lease(self.scraper_name, self.step_lease_timeout)
+        if lease_token is None:
+            raise ScrapingStepInProgress(
+                f"Another step of the scraping algorithm with {self.scraper_name=} "
+                f"is in progress."
+            )
+        self.__lease_token = lease_token
+        try:
+            return self.__step()
+        finally:
+            self.__lease_token = None
+            release_lease(self.scraper_name, lease_token)
+
+    def __step(self) -> ScrapeResult:
         self.__reload_configuration()
         logger.info(f"Reloaded the configuration for {self.__class__.__qualname__}")
         logger.info(self.make_log_message("Verifying the resource is active."))
@@ -159,10 +293,24 @@ class Scraper(ABC):
                 f"scraping algorithm with {self.scraper_name=}"
             )
         logger.info(self.make_log_message("Performing a scraping step."))
-        scrape_result = self.scrape()
-        logger.info(self.make_log_message("Updating a scraper state."))
-        self.state = scrape_result.state
-        if scrape_result.is_empty:
-            logger.info(self.make_log_message("Deactivating a scraper state."))
-            self.deactivate()
+        self.stats = {}
+        with contextlib.ExitStack() as writes:
+            self.__writes = writes
+            try:
+                scrape_result = self.scrape()
+                scrape_result = dataclasses.replace(
+                    scrape_result, stats=self.stats | scrape_result.stats
+                )
+                logger.info(
+                    self.make_log_message(f"Scraping stats: {scrape_result.stats}")
+                )
+                logger.info(self.make_log_message("Updating a scraper state."))
+                self.__begin_writes()
+                self.state = scrape_result.state
+                if scrape_result.is_empty:
+                    logger.info(self.make_log_message("Deactivating a scraper state."))
+                    self.deactivate()
+            finally:
+                self.__writes = None
+                self.__is_writing = False
         return scrape_result
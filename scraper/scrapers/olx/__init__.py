@@ -2,10 +2,17 @@ from datetime import timedelta
 
 from scraper.scrapers import Scraper
 from scraper.scrapers.olx.mixins import OLXScraperMixin
-from scraper.utils.scrapers.mixins import ChromeDriverProvider
+from scraper.utils.scrapers.mixins import (
+    ChromeDriverProvider,
+    ClientMixin,
+    BeautifulSoupMixin,
+)
 
 __all__ = ("LaptopsOLXScraper",)
 
 
-class LaptopsOLXScraper(OLXScraperMixin, ChromeDriverProvider, Scraper):
+class LaptopsOLXScraper(
+    OLXScraperMixin, ClientMixin, BeautifulSoupMixin, ChromeDriverProvider, Scraper
+):
     scrape_data_countdown: timedelta = timedelta(minutes=1)
+    natural_key_field = "link"
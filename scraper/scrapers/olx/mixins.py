@@ -1,12 +1,16 @@
-from typing import cast
+from typing import cast, Optional
 
-import selenium.common
 from celery.utils.log import get_task_logger
 
 from scraper.scrapers import Scraper
 from scraper.scrapers.base import ScrapeResult
-from scraper.utils.decorators.scrapers import quiting_driver
-from scraper.utils.scrapers.mixins import DriverProvider
+from scraper.utils.scrapers.extraction import Field
+from scraper.utils.scrapers.waits import WaitStrategy
+from scraper.utils.scrapers.mixins import (
+    DriverProvider,
+    ClientMixin,
+    BeautifulSoupMixin,
+)
 from selenium.webdriver.common.by import By
 
 __all__ = ("OLXScraperMixin",)
@@ -15,55 +19,86 @@ logger = get_task_logger(__name__)
 
 
 class OLXScraperMixin:
+    offer_container = Field("//div[@data-cy='l-card']")
+    offer_fields = {
+        "header": Field(".//h6"),
+        "link": Field(".//a", attribute="href"),
+        "location": Field(".//p[@data-testid='location-date']"),
+    }
+
     def get_offer_list_url(self) -> str:
         return cast(Scraper, self).state.get("url") or cast(Scraper, self).resource.url
 
+    def parse_offer_details(self, html: Optional[str]) -> Optional[dict]:
+        if html is None:
+            return None
+        soup = cast(BeautifulSoupMixin, self).get_beautiful_soup(html)
+        price = soup.select_one("h3")
+        if price is None:
+            # The page has not been rendered on the server side.
+            return None
+        description = soup.select_one("div[data-cy='ad_description'] > div:last-child")
+        return {
+            "price": price.get_text(strip=True),
+            "description": ""
+            if description is None
+            else description.get_text("\n", strip=True),
+        }
+
+    def scrape_offer_details(self, waits: WaitStrategy, link: str) -> dict:
+        cast(DriverProvider, self).open_page(waits.driver, link)
+        offer_price = waits.find(by=By.XPATH, value="//h3").text
+        offer_description = waits.find_optional(
+            by=By.XPATH, value="//div[@data-cy='ad_description']/div[last()]"
+        )
+        return {
+            "price": offer_price,
+            "description": "" if offer_description is None else offer_description.text,
+        }
+
+    def enrich_offers(self, waits: WaitStrategy, data: list[dict]):
+        pages = cast(ClientMixin, self).fetch_pages(
+            [offer_data["link"] for offer_data in data]
+        )
+        fallbacks = 0
+        for offer_data, html in zip(data, pages):
+            details = self.parse_offer_details(html)
+            if details is None:
+                fallbacks += 1
+                details = self.scrape_offer_details(waits, offer_data["link"])
+            offer_data.update(details)
+        logger.info(
+            f"OLXScraper: Fetched {len(data) - fallbacks} offer details over HTTP, "
+            f"{fallbacks} with the browser."
+        )
+
     def scrape(self) -> ScrapeResult:
-        with quiting_driver(cast(DriverProvider, self).get_remote_driver()) as driver:
+        with cast(DriverProvider, self).leased_driver() as driver:
+            waits = WaitStrategy(driver)
             url = self.get_offer_list_url()
-            driver.implicitly_wait(1)
-            driver.get(url)
-            next_url = driver.find_element(
+            cast(DriverProvider, self).open_page(driver, url)
+            waits.until_ready((By.XPATH, self.offer_container.selector))
+            next_link = waits.find_optional(
                 by=By.XPATH, value="//a[@data-cy='pagination-forward']"
-            ).get_attribute("href")
-            offer_divs = driver.find_elements(
-                by=By.XPATH, value="//div[@data-cy='l-card']"
             )
-
-            logger.info("OLXScraper: Retrieved offer divs")
-
-            data = []
-            for offer_div in offer_divs:
-                offer_header = offer_div.find_element(by=By.TAG_NAME, value="h6").text
-                offer_link = offer_div.find_element(
-                    by=By.TAG_NAME, value="a"
-                ).get_attribute("href")
-                offer_location = offer_div.find_element(
-                    by=By.XPATH, value="//p[@data-testid='location-date']"
-                ).text
-                data.append(
-                    {
-                        "header": offer_header,
-                        "link": offer_link,
-                        "location": offer_location,
-                    }
+            next_url = None if next_link is None else next_link.get_attribute("href")
+            data = [
+                offer_data
+                for offer_data in cast(DriverProvider, self).extract(
+                    driver, self.offer_container, self.offer_fields
                 )
+                if offer_data["link"]
+            ]
             logger.info("OLXScraper: Parsed header, link, and location.")
 
-            for offer_data in data:
-                driver.get(offer_data["link"])
-                offer_price = driver.find_element(by=By.XPATH, value="//h3").text
-                try:
-                    offer_description = driver.find_element(
-                        by=By.XPATH,
-                        value="//div[@data-cy='ad_description']/div[last()]",
-                    ).text
-                except selenium.common.exceptions.NoSuchElementException:
-                    offer_description = ""
-                offer_data["price"] = offer_price
-                offer_data["description"] = offer_description
+            self.enrich_offers(waits, data)
 
             logger.info("OLXScraper: Parsed price and description")
 
             scraped_data = cast(Scraper, self).build_scraped_data(data)
-            return ScrapeResult(data=scraped_data, state={"url": next_url})
+            logger.info(f"OLXScraper: Waited {waits.waited:.2f}s for the elements.")
+            return ScrapeResult(
+                data=scraped_data,
+                state={"url": next_url},
+                stats={"wait_time": waits.waited},
+            )
@@ -0,0 +1,185 @@
+import asyncio
+import dataclasses
+import functools
+import os
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor
+from typing import Optional
+
+import lxml.etree
+import lxml.html
+from celery.utils.log import get_task_logger
+from selenium.webdriver.common.by import By
+
+from scraper.scrapers.base import Scraper, ScrapeResult
+from scraper.utils.client.pool import run_in_event_loop
+from scraper.utils.scrapers.extraction import Field
+from scraper.utils.scrapers.mixins import ClientMixin
+
+__all__ = (
+    "StaticScraper",
+    "StaticScraperOptions",
+    "compile_selector",
+    "parse_document",
+)
+
+logger = get_task_logger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class StaticScraperOptions:
+    parse_processes: int = 2
+    # The smaller pages are parsed in the scraping process,
+    # since sending them to another process costs more than parsing them.
+    process_pool_threshold: int = 256 * 1024
+
+    @classmethod
+    def from_settings(cls) -> "StaticScraperOptions":
+        from django.conf import settings
+
+        options = getattr(settings, "STATIC_SCRAPER", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def compile_selector(selector: str, by: str = By.XPATH) -> lxml.etree.XPath:
+    if by == By.CSS_SELECTOR:
+        from cssselect import GenericTranslator
+
+        selector = GenericTranslator().css_to_xpath(selector, prefix="descendant::")
+    elif by != By.XPATH:
+        raise ValueError(f"Cannot compile a selector with {by=}")
+    return lxml.etree.XPath(selector)
+
+
+def _read(node: lxml.html.HtmlElement, field: Field) -> Optional[str]:
+    if field.attribute is not None:
+        return node.get(field.attribute)
+    return "\n".join(text.strip() for text in node.itertext() if text.strip())
+
+
+def _find_one(root, field: Field):
+    nodes = compile_selector(field.selector, field.by)(root)
+    return nodes[0] if nodes else None
+
+
+def parse_document(
+    html: str,
+    base_url: str,
+    container: Field,
+    fields: dict[str, Field],
+    next_page: Optional[Field] = None,
+) -> tuple[list[dict[str, Optional[str]]], Optional[str]]:
+    document = lxml.html.document_fromstring(html, base_url=base_url)
+    document.make_links_absolute(base_url, resolve_base_href=True)
+    items = []
+    for node in compile_selector(container.selector, container.by)(document):
+        item = {}
+        for name, field in fields.items():
+            found = _find_one(node, field)
+            item[name] = None if found is None else _read(found, field)
+        items.append(item)
+    next_url = None
+    if next_page is not None and (found := _find_one(document, next_page)) is not None:
+        next_url = _read(found, next_page)
+    return items, next_url
+
+
+_executor: Optional[Executor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def is_daemon_process() -> bool:
+    # The Celery prefork workers are daemonic billiard processes,
+    # which are not allowed to have children.
+    import billiard
+    import multiprocessing
+
+    return bool(
+        billiard.current_process().daemon or multiprocessing.current_process().daemon
+    )
+
+
+def start_parse_executor(options: StaticScraperOptions) -> Optional[Executor]:
+    if is_daemon_process():
+        logger.info("Parsing in the threads of the worker, it cannot have children.")
+        return None
+    executor = ProcessPoolExecutor(max_workers=options.parse_processes)
+    try:
+        # The processes are started lazily, by the first task.
+        executor.submit(os.getpid).result(timeout=30)
+    except Exception as exc:
+        logger.warning(f"Cannot start the parsing process pool: {exc}")
+        executor.shutdown(wait=False, cancel_futures=True)
+        return None
+    return executor
+
+
+def get_parse_executor(options: StaticScraperOptions) -> Optional[Executor]:
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor_pid != os.getpid():
+            _executor = start_parse_executor(options)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+class StaticScraper(ClientMixin, Scraper, abstract=True):
+    container: Field
+    fields: dict[str, Field]
+    next_page: Optional[Field] = None
+
+    def __init__(self):
+        super().__init__()
+        self.options = StaticScraperOptions.from_settings()
+
+    def get_page_url(self) -> str:
+        return self.state.get("url") or self.resource.url
+
+    async def parse(self, html: str, url: str):
+        parse = functools.partial(
+            parse_document, html, url, self.container, self.fields, self.next_page
+        )
+        if len(html) < self.options.process_pool_threshold:
+            return parse()
+        loop = asyncio.get_running_loop()
+        # The pool is started and probed in a thread, so the loop keeps fetching
+        # the other pages. Without the pool, the page is parsed in a thread as well.
+        executor = await loop.run_in_executor(None, get_parse_executor, self.options)
+        try:
+            return await loop.run_in_executor(executor, parse)
+        except BrokenExecutor as exc:
+            logger.warning(f"The parsing process pool is broken: {exc}")
+            return await loop.run_in_executor(None, parse)
+
+    async def fetch_and_parse(self, urls: list[str]) -> list[Optional[tuple]]:
+        client = self.get_async_http_client(logger=logger)
+
+        async def fetch_and_parse_one(url: str):
+            await self.async_throttle(url)
+            response = await client.get(
+                url=url, request_kwargs={"follow_redirects": True}
+            )
+            if response is None:
+                return None
+            return await self.parse(response.text, str(response.url))
+
+        return await asyncio.gather(*(fetch_and_parse_one(url) for url in urls))
+
+    def scrape(self) -> ScrapeResult:
+        url = self.get_page_url()
+        (parsed,) = run_in_event_loop(self.fetch_and_parse([url]))
+        if parsed is None:
+            raise RuntimeError(f"Cannot fetch the page with {url=}")
+        items, next_url = parsed
+        logger.info(f"{type(self).__qualname__}: Parsed {len(items)} items.")
+        scraped_data = self.build_scraped_data(items)
+        return ScrapeResult(data=scraped_data, state={"url": next_url})
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from scraper.models import ScraperConfiguration, Resource, Topic, ScrapedData
+from scraper.utils.models.misc import get_queryset
+from scraper.utils.models.scraped_data import bump_scraped_data_versions
+from scraper.utils.models.scraper_configuration import bump_configuration_versions
+
+
+@receiver(post_save, sender=ScraperConfiguration)
+@receiver(post_delete, sender=ScraperConfiguration)
+def invalidate_configuration_snapshot(sender, instance: ScraperConfiguration, **kwargs):
+    bump_configuration_versions((instance.scraper_name,))
+
+
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def invalidate_resource_configuration_snapshots(sender, instance: Resource, **kwargs):
+    bump_configuration_versions(
+        get_queryset(ScraperConfiguration)
+        .filter(resource_id=instance.pk)
+        .values_list("scraper_name", flat=True)
+    )
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def invalidate_topic_configuration_snapshots(sender, instance: Topic, **kwargs):
+    bump_configuration_versions(
+        get_queryset(ScraperConfiguration)
+        .filter(resource__topic_id=instance.pk)
+        .values_list("scraper_name", flat=True)
+    )
+
+
+@receiver(post_save, sender=ScrapedData)
+@receiver(post_delete, sender=ScrapedData)
+def invalidate_scraped_data_responses(sender, instance: ScrapedData, **kwargs):
+    bump_scraped_data_versions((instance.resource_id,))
+
+
+# The scraped data responses may embed the expanded resources and topics.
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def invalidate_resource_scraped_data_responses(sender, instance: Resource, **kwargs):
+    bump_scraped_data_versions((instance.pk,))
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def invalidate_topic_scraped_data_responses(sender, instance: Topic, **kwargs):
+    bump_scraped_data_versions(
+        get_queryset(Resource).filter(topic_id=instance.pk).values_list("pk", flat=True)
+    )
@@ -1,21 +1,29 @@
-from collections.abc import Iterable
-from functools import partial
-
 from celery import shared_task, Task
 from celery.utils.log import get_task_logger
-
-from scraper.api.serializers import ScrapedDataSerializer
-from scraper.models import ScrapedData, Resource
-from scraper.scrapers import get_from_registry, Scraper, ScrapeResult
-from scraper.utils.client.client import HttpClient
+from django.db.models import Exists, OuterRef
+
+from scraper.models import Resource, Integration, IntegrationConsumption
+from scraper.scrapers import (
+    get_from_registry,
+    Scraper,
+    ScrapeResult,
+    ScrapingLeaseLost,
+    ScrapingStepInProgress,
+)
 from scraper.utils.decorators.misc import with_logger
+from scraper.utils.models.misc import get_queryset
 from scraper.utils.models.resource import get_resource_by_pk
-from scraper.utils.tasks.hooks import add_consumer, add_consumers
-from scraper.utils.models.scraped_data import (
-    get_scraped_data_by_pk,
-    get_scraped_data_by_pk_list,
+from scraper.utils.tasks.delivery import deliver_to_integrations
+from scraper.utils.models.integration import get_push_integration_by_pk
+from scraper.utils.tasks.hooks import add_consumers, ConsumptionRecorder
+from scraper.utils.tasks.payload import (
+    build_payload,
+    get_idempotency_key,
+    get_payload_request_kwargs,
 )
+from scraper.utils.models.scraped_data import get_scraped_data_by_pk_list
 from scraper.utils.tasks.mixins import TaskWithRetryMixin, TransactionAwareTaskMixin
+from scraper.utils.tasks.scheduler import schedule_now
 
 logger = get_task_logger(__name__)
 
@@ -24,7 +32,7 @@ class ScrapingDispatcherTask(Task, TaskWithRetryMixin):
     pass
 
 
-class ScrapingTask(Task, TaskWithRetryMixin):
+class ScrapingTask(Task, TaskWithRetryMixin, TransactionAwareTaskMixin):
     autoretry_for = (RuntimeError, AssertionError)
 
 
@@ -32,71 +40,68 @@ class SendScrapedDataTask(Task, TaskWithRetryMixin, TransactionAwareTaskMixin):
     pass
 
 
-@shared_task(base=SendScrapedDataTask)
-def send_data(scraped_data_pk: int):
+class DeliveryFailed(RuntimeError):
+    pass
 
-    scraped_data = get_scraped_data_by_pk(pk=scraped_data_pk)
-    if scraped_data is None:
-        logger.error(
-            f"Cannot retrieve an instance of {ScrapedData.__qualname__!r} by {scraped_data_pk=!r}"
-            f"Aborting sending data."
-        )
-        return
 
-    if not scraped_data.data:
+@shared_task(base=SendScrapedDataTask)
+def deliver_batch(integration_pk: int, scraped_data_pk_list: list[int]):
+    integration = get_push_integration_by_pk(pk=integration_pk)
+    if integration is None:
         logger.error(
-            f"The provided {ScrapedData.__qualname__!r} with {scraped_data_pk=} has no data to send"
-            f"Aborting sending data."
+            f"Cannot retrieve an active push {Integration.__qualname__!r} "
+            f"by {integration_pk=!r}. Aborting sending data."
         )
         return
 
-    client = HttpClient()
-    add_consumer_hook = partial(add_consumer, scraped_data)
-    for integration in scraped_data.resource.topic.integrations.all():
-        client.post(
-            url=integration.hook_url,
-            request_kwargs={
-                "json": ScrapedDataSerializer(
-                    instance=scraped_data, expand=["resource", "resource.topic"]
-                ).data,
-            },
-            client_kwargs={
-                "event_hooks": {
-                    "response": [with_logger(logger)(add_consumer_hook(integration))],
-                }
-            },
+    # The items recorded as consumed by an earlier attempt are not sent again,
+    # unless they have changed since, in which case their latest version is sent.
+    scraped_data_batch = list(
+        get_scraped_data_by_pk_list(pk_list=scraped_data_pk_list)
+        .exclude(
+            Exists(
+                get_queryset(IntegrationConsumption).filter(
+                    integration=integration,
+                    scraped_data=OuterRef("pk"),
+                    content_hash=OuterRef("content_hash"),
+                )
+            )
         )
-
-
-@shared_task(base=SendScrapedDataTask)
-def send_batched_data(scraped_data_pk_list: list[int]):
-
-    scraped_data_batch = get_scraped_data_by_pk_list(pk_list=scraped_data_pk_list)
+        .order_by("pk")
+    )
     if not scraped_data_batch:
-        logger.error(
-            f"The queryset for {scraped_data_pk_list=} is empty."
-            f"Aborting sending data"
+        logger.info(
+            f"The integration with pk={integration_pk} has already consumed "
+            f"{scraped_data_pk_list=}."
         )
         return
 
-    client = HttpClient()
-    add_consumer_hook = partial(add_consumers, scraped_data_batch)
-    integrations = next(iter(scraped_data_batch)).resource.topic.integrations.all()
-    for integration in integrations:
-        client.post(
-            url=integration.hook_url,
-            request_kwargs={
-                "json": ScrapedDataSerializer(
-                    scraped_data_batch, many=True, expand=["resource", "resource.topic"]
-                ).data,
-            },
-            client_kwargs={
-                "event_hooks": {
-                    "response": [with_logger(logger)(add_consumer_hook(integration))],
-                }
-            },
+    request_kwargs = get_payload_request_kwargs(
+        build_payload(scraped_data_batch),
+        idempotency_key=get_idempotency_key(integration, scraped_data_batch),
+    )
+    (delivery,) = deliver_to_integrations(
+        (integration,), request_kwargs=request_kwargs, logger=logger
+    )
+    if not delivery.is_success:
+        status_code = getattr(delivery.response, "status_code", None)
+        if not delivery.is_retryable:
+            logger.error(
+                f"The integration with pk={integration_pk} rejected "
+                f"{scraped_data_pk_list=} with {status_code=}."
+            )
+            return
+        raise DeliveryFailed(
+            f"Failed to deliver {scraped_data_pk_list=} to the integration "
+            f"with pk={integration_pk}, {status_code=}."
         )
 
+    recorder = ConsumptionRecorder()
+    with_logger(logger)(add_consumers(recorder, scraped_data_batch, integration))(
+        delivery.response
+    )
+    logger.info(f"Recorded {recorder.flush()} integration consumptions.")
+
 
 @shared_task(base=ScrapingDispatcherTask)
 def scraping_dispatcher(resource_pk: int):
@@ -114,13 +119,8 @@ def scraping_dispatcher(resource_pk: int):
         )
         return
 
-    scraper_names = (
-        getattr(resource, "scraper_configs")
-        .all()
-        .values_list("scraper_name", flat=True)
-    )
-    for scraper_name in scraper_names:
-        scrape_data.apply_async(args=(scraper_name,))
+    # The scheduler releases the steps of the configurations which are due.
+    schedule_now(getattr(resource, "scraper_configs").all())
 
 
 @shared_task(base=ScrapingTask)
@@ -134,7 +134,14 @@ def scrape_data(scraper_name: str):
         )
         return
 
-    scraped_result: ScrapeResult = scraper.step()
+    try:
+        scraped_result: ScrapeResult = scraper.step()
+    except ScrapingLeaseLost as exc:
+        logger.warning(f"{exc} Rolled back the scraping step.")
+        return
+    except ScrapingStepInProgress as exc:
+        logger.warning(f"{exc} Dropped the duplicated scraping step.")
+        return
 
     if scraped_result.is_empty:
         logger.error(
@@ -143,11 +150,4 @@ def scrape_data(scraper_name: str):
         )
         return
 
-    scraped_data = scraped_result.data
-    if isinstance(scraped_data, Iterable):
-        send_batched_data.apply_async(args=([data.pk for data in scraped_data],))
-    else:
-        send_data.apply_async(args=(scraped_data.pk,))
-    scrape_data.apply_async(
-        args=(scraper_name,), countdown=scraper.scrape_data_countdown.seconds
-    )
+    # The new or changed items are delivered by the outbox relay.
@@ -1,3 +1,592 @@
-from django.test import TestCase
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from scraper.api.pagination import KeysetPagination
+from scraper.management.commands.benchmark_scraped_data_queries import (
+    INDEX_PATTERN,
+    INSERT_SYNTHETIC_ROWS,
+    LOCATIONS,
+    SEQUENTIAL_SCAN_PATTERN,
+    Command as BenchmarkCommand,
+)
+from scraper.models import (
+    Topic,
+    Resource,
+    Integration,
+    ScrapedData,
+    FeedEntry,
+    PendingDelivery,
+    IntegrationConsumption,
+    ScraperConfiguration,
+)
+from scraper.scrapers.olx import LaptopsOLXScraper
+from scraper.scrapers.static import StaticScraper, StaticScraperOptions
+from scraper.tasks import deliver_batch
+from scraper.utils.client.pool import run_in_event_loop
+from scraper.utils.scrapers.extraction import Field
+from scraper.utils.models.integration import FEED_LOCK_ID, append_to_feed
+from scraper.utils.models.retention import (
+    ArchiveSettings,
+    get_expired_buckets,
+    retire_bucket,
+)
+from scraper.utils.models.scraped_data import bump_scraped_data_versions
+from scraper.utils.models.scraper_configuration import (
+    acquire_lease,
+    release_lease,
+    update_fenced,
+)
+from scraper.utils.scrapers.ratelimit import InMemoryRateLimiterBackend, Rate
+from scraper.utils.tasks.batching import (
+    PendingBatch,
+    add_pending_deliveries,
+    get_due_chunks,
+    split_batch,
+)
+from scraper.utils.tasks.scheduler import (
+    LeaderLease,
+    SchedulerSettings,
+    ScrapingScheduler,
+)
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+NOW = datetime(2022, 6, 1, tzinfo=timezone.utc)
+
+
+def make_batch(**kwargs) -> PendingBatch:
+    return PendingBatch(
+        **{
+            "integration_id": 1,
+            "items": 1,
+            "size": 100,
+            "oldest": NOW,
+            "max_items": 3,
+            "max_bytes": 1000,
+            "max_latency": 10,
+        }
+        | kwargs
+    )
+
+
+class SplitBatchTestCase(SimpleTestCase):
+    def test_splits_by_items(self):
+        pending = [(pk, pk, 10) for pk in range(7)]
+        chunks = split_batch(pending, max_items=3, max_bytes=1000)
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual([item for chunk in chunks for item in chunk], pending)
+
+    def test_splits_by_bytes(self):
+        pending = [(1, 1, 400), (2, 2, 400), (3, 3, 400)]
+        chunks = split_batch(pending, max_items=10, max_bytes=1000)
+        self.assertEqual(chunks, [pending[:2], pending[2:]])
+
+    def test_oversized_item_gets_its_own_chunk(self):
+        pending = [(1, 1, 100), (2, 2, 5000), (3, 3, 100)]
+        chunks = split_batch(pending, max_items=10, max_bytes=1000)
+        self.assertEqual(chunks, [pending[:1], pending[1:2], pending[2:]])
+
+    def test_empty(self):
+        self.assertEqual(split_batch([], max_items=3, max_bytes=1000), [])
+
+
+class PendingBatchTestCase(SimpleTestCase):
+    def test_is_not_due_below_the_limits(self):
+        self.assertFalse(
+            make_batch(items=2, size=999).is_due(NOW + timedelta(seconds=9))
+        )
+
+    def test_is_due_when_full(self):
+        self.assertTrue(make_batch(items=3).is_due(NOW))
+
+    def test_is_due_when_large(self):
+        self.assertTrue(make_batch(size=1000).is_due(NOW))
+
+    def test_is_due_when_late(self):
+        self.assertTrue(make_batch().is_due(NOW + timedelta(seconds=10)))
+
+
+class DueChunksTestCase(SimpleTestCase):
+    def test_holds_back_the_partial_last_chunk(self):
+        pending = [(pk, pk, 10) for pk in range(5)]
+        chunks = get_due_chunks(make_batch(items=5), pending, NOW)
+        self.assertEqual(chunks, [pending[:3]])
+
+    def test_sends_the_full_last_chunk(self):
+        pending = [(pk, pk, 10) for pk in range(6)]
+        chunks = get_due_chunks(make_batch(items=6), pending, NOW)
+        self.assertEqual(chunks, [pending[:3], pending[3:]])
+
+    def test_sends_the_last_chunk_filled_by_bytes(self):
+        pending = [(1, 1, 600), (2, 2, 400)]
+        chunks = get_due_chunks(make_batch(items=2, size=1000), pending, NOW)
+        self.assertEqual(chunks, [pending])
+
+    def test_sends_the_partial_last_chunk_when_late(self):
+        pending = [(pk, pk, 10) for pk in range(5)]
+        chunks = get_due_chunks(
+            make_batch(items=5), pending, NOW + timedelta(seconds=10)
+        )
+        self.assertEqual(chunks, [pending[:3], pending[3:]])
+
+
+class AddPendingDeliveriesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        topic = Topic.objects.create(title="Pending deliveries")
+        cls.integration = Integration.objects.create(
+            topic=topic, title="Pending deliveries", hook_url="https://example.com/"
+        )
+        resource = Resource.objects.create(
+            topic=topic, title="Pending deliveries", url="https://www.olx.pl/"
+        )
+        cls.scraped_data = ScrapedData.objects.create(resource=resource, data={})
+
+    def test_requeued_item_gets_its_latest_size(self):
+        item = (self.scraped_data.pk, self.integration.topic_id)
+        add_pending_deliveries([(*item, 100)])
+        add_pending_deliveries([(*item, 250), (*item, 300)])
+        pending = PendingDelivery.objects.get()
+        self.assertEqual(pending.integration_id, self.integration.pk)
+        self.assertEqual(pending.size, 300)
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "The query plans are checked on Postgres."
+)
+class ScrapedDataQueryPlanTestCase(TestCase):
+    rows = 100_000
+
+    @classmethod
+    def setUpTestData(cls):
+        topic = Topic.objects.create(title="Query plans")
+        cls.integration = Integration.objects.create(
+            topic=topic, title="Query plans", hook_url="https://example.com/"
+        )
+        cls.resources = Resource.objects.bulk_create(
+            [
+                Resource(
+                    topic=topic,
+                    title=f"Query plans {number}",
+                    url="https://www.olx.pl/",
+                )
+                for number in range(10)
+            ]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                INSERT_SYNTHETIC_ROWS,
+                {
+                    "resources": [resource.pk for resource in cls.resources],
+                    "locations": list(LOCATIONS),
+                    "rows": cls.rows,
+                },
+            )
+            cursor.execute("ANALYZE scraper_scrapeddata")
+
+    def test_filters_use_indexes(self):
+        queries = BenchmarkCommand().get_queries(self.resources[0], self.integration)
+        for name, queryset in queries.items():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertIsNone(SEQUENTIAL_SCAN_PATTERN.search(plan), plan)
+                self.assertTrue(INDEX_PATTERN.search(plan), plan)
+
+
+class DeliverBatchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        topic = Topic.objects.create(title="Deliveries")
+        cls.integration = Integration.objects.create(
+            topic=topic, title="Deliveries", hook_url="https://example.com/"
+        )
+        resource = Resource.objects.create(
+            topic=topic, title="Deliveries", url="https://www.olx.pl/"
+        )
+        cls.scraped_data = ScrapedData.objects.create(
+            resource=resource, natural_key="1", data={"price": 1}, content_hash="a"
+        )
+        IntegrationConsumption.objects.create(
+            integration=cls.integration,
+            scraped_data=cls.scraped_data,
+            content_hash="a",
+        )
+
+    def deliver(self) -> mock.Mock:
+        delivery = mock.Mock(is_success=True)
+        delivery.response.is_success = True
+        with mock.patch(
+            "scraper.tasks.deliver_to_integrations", return_value=[delivery]
+        ) as deliver_to_integrations:
+            deliver_batch(self.integration.pk, [self.scraped_data.pk])
+        return deliver_to_integrations
+
+    def test_skips_the_consumed_version(self):
+        self.deliver().assert_not_called()
+
+    def test_sends_the_changed_version(self):
+        ScrapedData.objects.filter(pk=self.scraped_data.pk).update(
+            data={"price": 2}, content_hash="b"
+        )
+        self.deliver().assert_called_once()
+        consumption = IntegrationConsumption.objects.get()
+        self.assertEqual(consumption.content_hash, "b")
+        self.deliver().assert_not_called()
+
+
+class ThreadRecordingScraper(StaticScraper, abstract=True):
+    container = Field("//li")
+    fields = {"text": Field(".")}
+
+
+class StaticScraperParseTestCase(SimpleTestCase):
+    html = "<ul>" + "<li>item</li>" * 100 + "</ul>"
+
+    def parse(self) -> list[threading.Thread]:
+        scraper = ThreadRecordingScraper()
+        scraper.options = StaticScraperOptions(process_pool_threshold=0)
+        threads = []
+
+        def parse_document(*args):
+            threads.append(threading.current_thread())
+            return [], None
+
+        with mock.patch("scraper.scrapers.static.parse_document", parse_document):
+            run_in_event_loop(scraper.parse(self.html, "https://example.com/"))
+        return threads
+
+    def test_parses_in_a_thread_without_the_process_pool(self):
+        with mock.patch(
+            "scraper.scrapers.static.get_parse_executor", return_value=None
+        ):
+            (thread,) = self.parse()
+        self.assertIsNot(thread, threading.current_thread())
+
+
+class InMemoryLeaderLease:
+    def __init__(self):
+        self.holder = None
+
+    def elect(self, node_id: str, timeout: float) -> bool:
+        if self.holder in (None, node_id):
+            self.holder = node_id
+        return self.holder == node_id
+
+    def resign(self, node_id: str):
+        if self.holder == node_id:
+            self.holder = None
+
+
+class ScrapingSchedulerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        topic = Topic.objects.create(title="Scheduler")
+        resource = Resource.objects.create(
+            topic=topic, title="Scheduler", url="https://www.olx.pl/"
+        )
+        cls.configuration = ScraperConfiguration.objects.create(
+            resource=resource, scraper_name=LaptopsOLXScraper.scraper_name
+        )
+
+    def setUp(self):
+        self.lease = InMemoryLeaderLease()
+        patcher = mock.patch(
+            "scraper.utils.tasks.scheduler.get_priority_countdown",
+            side_effect=lambda countdown, priority: countdown,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_scheduler(self, node_id: str) -> ScrapingScheduler:
+        return ScrapingScheduler(SchedulerSettings(), node_id=node_id, lease=self.lease)
+
+    def run_once(self, scheduler: ScrapingScheduler, apply_async=None) -> mock.Mock:
+        with mock.patch(
+            "scraper.tasks.scrape_data.apply_async", side_effect=apply_async
+        ) as published, self.captureOnCommitCallbacks(execute=True):
+            scheduler.run_once()
+        return published
+
+    def test_only_the_leader_releases(self):
+        leader, follower = self.make_scheduler("a"), self.make_scheduler("b")
+        self.run_once(leader).assert_called_once()
+        self.run_once(follower).assert_not_called()
+        leader.resign()
+        # The released step still blocks the next one, whoever the leader is.
+        self.run_once(follower).assert_not_called()
+        self.assertEqual(self.lease.holder, "b")
+
+    def test_saves_the_release_before_publishing(self):
+        def start_step(args, queue):
+            # A fast worker starts the step as soon as it is published.
+            self.assertIsNotNone(acquire_lease(args[0], timedelta(minutes=5)))
+
+        self.run_once(self.make_scheduler("a"), apply_async=start_step)
+        self.configuration.refresh_from_db()
+        self.assertIsNone(self.configuration.released_at)
+        self.assertEqual(self.configuration.lease_token, 1)
+        self.assertIsNotNone(self.configuration.next_run_at)
+
+    def test_skips_the_released_configuration(self):
+        scheduler = self.make_scheduler("a")
+        self.run_once(scheduler).assert_called_once()
+        ScraperConfiguration.objects.update(next_run_at=None)
+        scheduler.refresh()
+        self.assertEqual(scheduler.release_due(), 0)
+
+
+@unittest.skipUnless(fakeredis, "The Lua scripts need fakeredis with lupa.")
+class LeaderLeaseTestCase(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("redis.Redis.from_url", return_value=fakeredis.FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.lease = LeaderLease("redis://localhost")
+
+    def test_has_a_single_holder(self):
+        self.assertTrue(self.lease.elect("a", timeout=30))
+        self.assertFalse(self.lease.elect("b", timeout=30))
+        # The holder renews it.
+        self.assertTrue(self.lease.elect("a", timeout=30))
+
+    def test_only_the_holder_resigns(self):
+        self.lease.elect("a", timeout=30)
+        self.lease.resign("b")
+        self.assertFalse(self.lease.elect("b", timeout=30))
+        self.lease.resign("a")
+        self.assertTrue(self.lease.elect("b", timeout=30))
+
+
+class InMemoryRateLimiterBackendTestCase(SimpleTestCase):
+    def setUp(self):
+        self.backend = InMemoryRateLimiterBackend()
+        self.clock = 100.0
+        patcher = mock.patch(
+            "scraper.utils.scrapers.ratelimit.time.monotonic", lambda: self.clock
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def reserve(self, rate: Rate, times: int = 1) -> list[float]:
+        return [self.backend.reserve("olx.pl", rate) for _ in range(times)]
+
+    def test_lets_the_burst_through(self):
+        self.assertEqual(self.reserve(Rate(rate=2, burst=3), times=3), [0, 0, 0])
+
+    def test_queues_the_requests_beyond_the_burst(self):
+        self.assertEqual(self.reserve(Rate(rate=2), times=4), [0, 0.5, 1, 1.5])
+
+    def test_refills_with_time_up_to_the_burst(self):
+        rate = Rate(rate=2, burst=2)
+        self.reserve(rate, times=3)
+        # The reserved token is produced in half a second, the bucket is full a second later.
+        self.clock += 10
+        self.assertEqual(self.reserve(rate, times=3), [0, 0, 0.5])
+
+    def test_rejects_the_rates_which_are_not_positive(self):
+        for rate in (0, -1):
+            with self.subTest(rate=rate), self.assertRaises(ValueError):
+                Rate(rate=rate)
+
+
+class ResourceRateLimitTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.topic = Topic.objects.create(title="Rate limits")
+
+    def test_rejects_the_rates_which_are_not_positive(self):
+        resource = Resource(
+            topic=self.topic,
+            title="Rate limits",
+            url="https://www.olx.pl/",
+            rate_limit=0,
+        )
+        with self.assertRaises(ValidationError):
+            resource.full_clean()
+        with self.assertRaises(IntegrityError):
+            resource.save()
+
+
+class ScraperConfigurationLeaseTestCase(TestCase):
+    timeout = timedelta(minutes=5)
+
+    @classmethod
+    def setUpTestData(cls):
+        topic = Topic.objects.create(title="Leases")
+        resource = Resource.objects.create(
+            topic=topic, title="Leases", url="https://www.olx.pl/"
+        )
+        cls.configuration = ScraperConfiguration.objects.create(
+            resource=resource, scraper_name=LaptopsOLXScraper.scraper_name
+        )
+
+    def acquire(self):
+        return acquire_lease(self.configuration.scraper_name, self.timeout)
+
+    def test_is_held_by_a_single_step(self):
+        token = self.acquire()
+        self.assertEqual(token, 1)
+        self.assertIsNone(self.acquire())
+        self.assertTrue(release_lease(self.configuration.scraper_name, token))
+        self.assertEqual(self.acquire(), 2)
+
+    def test_expired_lease_is_taken_over(self):
+        token = self.acquire()
+        ScraperConfiguration.objects.update(lease_expires_at=datetime.now(timezone.utc))
+        self.assertEqual(self.acquire(), token + 1)
+        # The previous holder can neither give it back nor write anymore.
+        self.assertFalse(release_lease(self.configuration.scraper_name, token))
+        self.configuration.state = {"page": 2}
+        self.assertFalse(update_fenced(self.configuration, token, "state"))
+        self.configuration.refresh_from_db()
+        self.assertEqual(self.configuration.state, {})
+
+    def test_holder_writes(self):
+        token = self.acquire()
+        self.configuration.state = {"page": 2}
+        self.assertTrue(update_fenced(self.configuration, token, "state"))
+        self.configuration.refresh_from_db()
+        self.assertEqual(self.configuration.state, {"page": 2})
+
+
+class RetireBucketTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        topic = Topic.objects.create(title="Retention")
+        cls.integration = Integration.objects.create(
+            topic=topic, title="Retention", hook_url="https://example.com/"
+        )
+        cls.resource = Resource.objects.create(
+            topic=topic, title="Retention", url="https://www.olx.pl/", retention_days=30
+        )
+        for pk in range(5):
+            scraped_data = ScrapedData.objects.create(
+                resource=cls.resource, data={"pk": pk}
+            )
+            IntegrationConsumption.objects.create(
+                integration=cls.integration, scraped_data=scraped_data
+            )
+        ScrapedData.objects.update(modified=NOW)
+        cls.kept = ScrapedData.objects.create(resource=cls.resource, data={})
+        ScrapedData.objects.filter(pk=cls.kept.pk).update(modified=NOW)
+        PendingDelivery.objects.create(
+            integration=cls.integration, scraped_data=cls.kept, size=10
+        )
+
+    def test_retires_the_bucket_in_parts(self):
+        (bucket,) = get_expired_buckets(self.resource, now=NOW + timedelta(days=90))
+        with tempfile.TemporaryDirectory() as directory:
+            settings = ArchiveSettings(directory=directory, part_size=2)
+            paths, deleted = retire_bucket(bucket, settings)
+            self.assertEqual(deleted, 5)
+            # Each part has the scraped data and its consumptions.
+            self.assertEqual(len(paths), 6)
+            self.assertTrue(all(path.exists() for path in paths))
+        self.assertEqual(
+            list(ScrapedData.objects.values_list("pk", flat=True)), [self.kept.pk]
+        )
+        self.assertFalse(IntegrationConsumption.objects.exists())
+
+
+class KeysetPaginationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        topic = Topic.objects.create(title="Pagination")
+        resource = Resource.objects.create(
+            topic=topic, title="Pagination", url="https://www.olx.pl/"
+        )
+        for pk in range(5):
+            ScrapedData.objects.create(resource=resource, data={"pk": pk})
+        # The rows inserted together share their creation time, only the id tells them apart.
+        ScrapedData.objects.update(created=NOW)
+        cls.pks = list(ScrapedData.objects.order_by("-id").values_list("pk", flat=True))
+
+    def paginate(self, url: str) -> tuple[list[int], KeysetPagination]:
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get(url))
+        page = paginator.paginate_queryset(ScrapedData.objects.all(), request)
+        return [scraped_data.pk for scraped_data in page], paginator
+
+    def test_pages_through_the_rows_created_at_once(self):
+        pages, url = [], "/scraped-data/?page_size=2"
+        while url:
+            page, paginator = self.paginate(url)
+            pages.append(page)
+            url = paginator.get_next_link()
+        self.assertEqual(pages, [self.pks[:2], self.pks[2:4], self.pks[4:]])
+        # And back, from the last page.
+        page, paginator = self.paginate(paginator.get_previous_link())
+        self.assertEqual(page, self.pks[2:4])
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class ScrapedDataResponseCacheTestCase(TestCase):
+    url = "/api/scraped-data/"
+
+    @classmethod
+    def setUpTestData(cls):
+        topic = Topic.objects.create(title="Response cache")
+        cls.resource = Resource.objects.create(
+            topic=topic, title="Response cache", url="https://www.olx.pl/"
+        )
+        ScrapedData.objects.create(resource=cls.resource, data={})
+
+    def setUp(self):
+        cache.clear()
+
+    def test_returns_not_modified_for_the_same_version(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_returns_the_changed_data(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_scraped_data_versions((self.resource.pk,))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class AppendToFeedTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.topics = [Topic.objects.create(title=f"Feed {pk}") for pk in range(3)]
+        resource = Resource.objects.create(
+            topic=cls.topics[0], title="Feed", url="https://www.olx.pl/"
+        )
+        cls.scraped_data = ScrapedData.objects.create(resource=resource, data={})
+
+    def get_locked_topics(self) -> list[int]:
+        # The two keys of an advisory lock are its classid and objid.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT objid FROM pg_locks WHERE locktype = 'advisory' "
+                "AND pid = pg_backend_pid() AND classid = %s ORDER BY objid",
+                [FEED_LOCK_ID],
+            )
+            return [objid for objid, in cursor.fetchall()]
+
+    def test_locks_only_the_feeds_of_its_topics(self):
+        topics = sorted(topic.pk for topic in self.topics[1:])
+        items = [(self.scraped_data.pk, topic_id) for topic_id in reversed(topics)]
+        self.assertEqual(append_to_feed(items), 2)
+        self.assertEqual(self.get_locked_topics(), topics)
+        self.assertEqual(
+            sorted(FeedEntry.objects.values_list("topic_id", flat=True)), topics
+        )
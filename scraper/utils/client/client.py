@@ -1,24 +1,32 @@
 import dataclasses
+import inspect
 import logging
 from collections.abc import Callable
 from functools import partialmethod
+from typing import Optional
 
 import httpx
 
 from httpx._types import HeaderTypes
 
 from scraper.utils.client.hooks import log_request, log_response, raise_on_4xx_5xx
+from scraper.utils.client.pool import ClientPoolOptions, get_client_pool
 from scraper.utils.decorators.misc import with_logger
 
+# The keyword arguments of ``httpx.Client.request`` which are not accepted
+# by ``httpx.Client.build_request``.
+SEND_KWARGS = ("auth", "follow_redirects")
+
 
 @dataclasses.dataclass
-class HttpClient:
+class BaseHttpClient:
     request_hooks: list[Callable] = dataclasses.field(default_factory=list)
     response_hooks: list[Callable] = dataclasses.field(default_factory=list)
     headers: HeaderTypes = dataclasses.field(default_factory=dict)
     logger: logging.Logger = dataclasses.field(
         default_factory=lambda: logging.getLogger("django")
     )
+    pool_options: Optional[ClientPoolOptions] = None
 
     def __post_init__(self):
         self.__with_logger = with_logger(self.logger)
@@ -32,36 +40,131 @@ class HttpClient:
             + [raise_on_4xx_5xx],
         }
 
-    def __prepare_client_kwargs(self, client_kwargs=None):
-        client_kwargs = {} if client_kwargs is None else client_kwargs
+    def _prepare_client_kwargs(self, client_kwargs=None):
+        client_kwargs = {} if client_kwargs is None else dict(client_kwargs)
         client_kwargs["event_hooks"] = self.__hooks | client_kwargs.get(
             "event_hooks", {}
         )
         return client_kwargs
 
-    def __prepare_request_kwargs(self, request_kwargs=None):
-        request_kwargs = {} if request_kwargs is None else request_kwargs
+    def _prepare_request_kwargs(self, request_kwargs=None):
+        request_kwargs = {} if request_kwargs is None else dict(request_kwargs)
         request_kwargs["headers"] = self.headers | request_kwargs.get("headers", {})
         return request_kwargs
 
+    @staticmethod
+    def _split_send_kwargs(request_kwargs) -> tuple[dict, dict]:
+        send_kwargs = {
+            key: request_kwargs.pop(key) for key in SEND_KWARGS if key in request_kwargs
+        }
+        return request_kwargs, send_kwargs
+
+    def _log_error(self, exc: httpx.HTTPError):
+        if isinstance(exc, httpx.HTTPStatusError):
+            self.logger.error(
+                f"Error response {exc.response.status_code} while requesting {exc.request.url!r}."
+            )
+        else:
+            self.logger.error(
+                f"An error occurred while requesting {exc.request.url!r}."
+            )
+            self.logger.exception(exc)
+
+
+@dataclasses.dataclass
+class HttpClient(BaseHttpClient):
+    def __send(
+        self, client: httpx.Client, method: str, url: str, event_hooks, request_kwargs
+    ):
+        # The pooled client is shared, so the per-call event hooks
+        # are run around the request instead of being bound to the client.
+        request_kwargs, send_kwargs = self._split_send_kwargs(request_kwargs)
+        request = client.build_request(method, url, **request_kwargs)
+        for hook in event_hooks.get("request", []):
+            hook(request)
+        response = client.send(request, **send_kwargs)
+        for hook in event_hooks.get("response", []):
+            hook(response)
+        return response
+
     def __make_request(
         self, method: str, url: str, client_kwargs=None, request_kwargs=None
     ):
-        client_kwargs = self.__prepare_client_kwargs(client_kwargs)
-        request_kwargs = self.__prepare_request_kwargs(request_kwargs)
-        with httpx.Client(**client_kwargs) as client:
-            try:
-                return client.request(method, url, **request_kwargs)
-            except httpx.RequestError as exc:
-                self.logger.error(
-                    f"An error occurred while requesting {exc.request.url!r}."
+        client_kwargs = self._prepare_client_kwargs(client_kwargs)
+        request_kwargs = self._prepare_request_kwargs(request_kwargs)
+        event_hooks = client_kwargs.pop("event_hooks")
+        pool = get_client_pool(self.pool_options)
+        try:
+            with pool.host_slot(url):
+                if client_kwargs:
+                    # A custom client configuration cannot reuse the pooled connections.
+                    with httpx.Client(
+                        **(pool.options.as_client_kwargs() | client_kwargs)
+                    ) as client:
+                        return self.__send(
+                            client, method, url, event_hooks, request_kwargs
+                        )
+                return self.__send(
+                    pool.get_client(), method, url, event_hooks, request_kwargs
                 )
-                self.logger.exception(exc)
-            except httpx.HTTPStatusError as exc:
-                self.logger.error(
-                    f"Error response {exc.response.status_code} while requesting {exc.request.url!r}."
+        except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+            self._log_error(exc)
+        return None
+
+    get = partialmethod(__make_request, "GET")
+    post = partialmethod(__make_request, "POST")
+    put = partialmethod(__make_request, "PUT")
+    patch = partialmethod(__make_request, "PATCH")
+    delete = partialmethod(__make_request, "DELETE")
+
+
+@dataclasses.dataclass
+class AsyncHttpClient(BaseHttpClient):
+    @staticmethod
+    async def __run_hook(hook: Callable, *args):
+        result = hook(*args)
+        if inspect.isawaitable(result):
+            await result
+
+    async def __send(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        event_hooks,
+        request_kwargs,
+    ):
+        request_kwargs, send_kwargs = self._split_send_kwargs(request_kwargs)
+        request = client.build_request(method, url, **request_kwargs)
+        for hook in event_hooks.get("request", []):
+            await self.__run_hook(hook, request)
+        response = await client.send(request, **send_kwargs)
+        for hook in event_hooks.get("response", []):
+            await self.__run_hook(hook, response)
+        return response
+
+    async def __make_request(
+        self, method: str, url: str, client_kwargs=None, request_kwargs=None
+    ):
+        client_kwargs = self._prepare_client_kwargs(client_kwargs)
+        request_kwargs = self._prepare_request_kwargs(request_kwargs)
+        event_hooks = client_kwargs.pop("event_hooks")
+        pool = get_client_pool(self.pool_options)
+        try:
+            async with pool.async_host_slot(url):
+                if client_kwargs:
+                    async with httpx.AsyncClient(
+                        **(pool.options.as_client_kwargs() | client_kwargs)
+                    ) as client:
+                        return await self.__send(
+                            client, method, url, event_hooks, request_kwargs
+                        )
+                return await self.__send(
+                    pool.get_async_client(), method, url, event_hooks, request_kwargs
                 )
-            return None
+        except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+            self._log_error(exc)
+        return None
 
     get = partialmethod(__make_request, "GET")
     post = partialmethod(__make_request, "POST")
@@ -0,0 +1,172 @@
+import asyncio
+import dataclasses
+import os
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional
+
+import httpx
+
+__all__ = (
+    "ClientPoolOptions",
+    "ClientPool",
+    "get_client_pool",
+    "close_client_pools",
+    "run_in_event_loop",
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class ClientPoolOptions:
+    http2: bool = False
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    max_connections_per_host: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    write_timeout: float = 10.0
+    pool_timeout: float = 5.0
+
+    @classmethod
+    def from_settings(cls) -> "ClientPoolOptions":
+        from django.conf import settings
+
+        options = getattr(settings, "HTTP_CLIENT_POOL", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+    def as_client_kwargs(self) -> dict:
+        return {"http2": self.http2, "limits": self.limits, "timeout": self.timeout}
+
+
+# A per-process keep-alive client reused across the requests and the tasks.
+class ClientPool:
+    def __init__(self, options: ClientPoolOptions):
+        self.options = options
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        # The async clients and semaphores are bound to the event loop they were created in.
+        self._async_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._async_host_slots: dict[
+            tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore
+        ] = {}
+
+    def get_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(**self.options.as_client_kwargs())
+            return self._client
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._async_clients[loop] = httpx.AsyncClient(
+                    **self.options.as_client_kwargs()
+                )
+            return client
+
+    def _get_host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(
+                    self.options.max_connections_per_host
+                )
+            return self._host_slots[host]
+
+    @contextmanager
+    def host_slot(self, url: httpx.URL | str):
+        slot = self._get_host_slot(httpx.URL(url).host)
+        with slot:
+            yield
+
+    def _get_async_host_slot(self, host: str) -> asyncio.Semaphore:
+        key = (asyncio.get_running_loop(), host)
+        with self._lock:
+            if key not in self._async_host_slots:
+                self._async_host_slots[key] = asyncio.Semaphore(
+                    self.options.max_connections_per_host
+                )
+            return self._async_host_slots[key]
+
+    @asynccontextmanager
+    async def async_host_slot(self, url: httpx.URL | str):
+        async with self._get_async_host_slot(httpx.URL(url).host):
+            yield
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            self._client = None
+            for loop, client in self._async_clients.items():
+                if not loop.is_closed() and not loop.is_running():
+                    loop.run_until_complete(client.aclose())
+            self._async_clients.clear()
+            self._async_host_slots.clear()
+
+
+_pools: dict[ClientPoolOptions, ClientPool] = {}
+_pools_pid: Optional[int] = None
+_pools_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_client_pool(options: Optional[ClientPoolOptions] = None) -> ClientPool:
+    global _pools_pid
+
+    options = ClientPoolOptions.from_settings() if options is None else options
+    with _pools_lock:
+        # The sockets must not be shared with the forked worker processes.
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if options not in _pools:
+            _pools[options] = ClientPool(options)
+        return _pools[options]
+
+
+def close_client_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    # A long-living loop per thread lets the async clients keep their connections
+    # between the tasks instead of being torn down by every ``asyncio.run`` call.
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed() or getattr(_local, "pid", None) != os.getpid():
+        loop = _local.loop = asyncio.new_event_loop()
+        _local.pid = os.getpid()
+    return loop
+
+
+def run_in_event_loop(coroutine):
+    return get_event_loop().run_until_complete(coroutine)
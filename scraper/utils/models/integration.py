@@ -0,0 +1,135 @@
+import secrets
+from collections.abc import Iterable
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.db.models import Q, QuerySet
+
+from scraper.models import Integration, ScrapedData, FeedEntry
+from scraper.utils.models.misc import (
+    get_queryset,
+    get_object_or_none,
+    get_default_manager,
+)
+from scraper.utils.tasks.hooks import ConsumptionRecorder
+
+# The feed of an integration is the sequence of the feed entries of its topic,
+# an entry is appended whenever the scraped data is created or changed.
+FeedPosition = int
+
+FEED_VERSION_CACHE_KEY = "scraper:feed:{topic_id}:version"
+
+# Held by the transaction appending to the feed of a topic until it commits,
+# the second key of the lock is the topic.
+FEED_LOCK_ID = 0x66656564
+
+
+def get_push_integrations() -> QuerySet[Integration]:
+    return get_queryset(Integration).filter(
+        status=Integration.ACTIVE_STATUS,
+        delivery_mode=Integration.DeliveryModeChoices.PUSH,
+    )
+
+
+def get_push_integration_by_pk(pk: int) -> Optional[Integration]:
+    return get_object_or_none(get_push_integrations(), pk=pk)
+
+
+def get_feed_version(topic_id: int) -> int:
+    return cache.get_or_set(
+        FEED_VERSION_CACHE_KEY.format(topic_id=topic_id),
+        lambda: secrets.randbits(31),
+        timeout=None,
+    )
+
+
+def bump_feed_versions(topic_ids: Iterable[int]):
+    keys = [
+        FEED_VERSION_CACHE_KEY.format(topic_id=topic_id) for topic_id in set(topic_ids)
+    ]
+
+    def bump():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+
+    transaction.on_commit(bump, using=router.db_for_write(FeedEntry))
+
+
+def append_to_feed(items: Iterable[tuple[int, int]]) -> int:
+    # The items are the scraped data pk and its topic pk. The ids of the entries of
+    # a topic are taken under a lock of the topic held until the commit, so they are
+    # committed in their order and a reader of the feed never skips an entry committed
+    # after the ones it has seen. The feeds of the other topics are appended to
+    # meanwhile, the locks are taken in the order of the topics, so without deadlocks.
+    # Must be called in a transaction.
+    items = list(items)
+    if not items:
+        return 0
+    using = router.db_for_write(FeedEntry)
+    with connections[using].cursor() as cursor:
+        # The keys of the lock are 32 bit, a collision only makes two topics wait.
+        for key in sorted({topic_id % 2**31 for _, topic_id in items}):
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [FEED_LOCK_ID, key])
+    entries = get_default_manager(FeedEntry).bulk_create(
+        [
+            FeedEntry(scraped_data_id=data_pk, topic_id=topic_id)
+            for data_pk, topic_id in items
+        ]
+    )
+    bump_feed_versions(topic_id for _, topic_id in items)
+    return len(entries)
+
+
+def after_position(position: Optional[FeedPosition]) -> Q:
+    return Q() if position is None else Q(id__gt=position)
+
+
+def get_feed_queryset(integration: Integration) -> QuerySet[FeedEntry]:
+    return get_queryset(FeedEntry).filter(topic_id=integration.topic_id).order_by("id")
+
+
+def get_feed(
+    integration: Integration, position: Optional[FeedPosition], limit: int
+) -> list[FeedEntry]:
+    return list(
+        get_feed_queryset(integration)
+        .filter(after_position(position))
+        .select_related("scraped_data")[:limit]
+    )
+
+
+def acknowledge_feed(
+    integration: Integration, position: FeedPosition, limit: int
+) -> tuple[int, FeedPosition]:
+    # The entries up to the position are recorded as consumed, at most the limit of
+    # them at once. The position of the integration is moved forward only,
+    # so a late acknowledgement is harmless. Returns the position acknowledged.
+    acknowledged = list(
+        get_feed_queryset(integration)
+        .filter(after_position(integration.feed_position), id__lte=position)
+        .values_list(
+            "id",
+            "scraped_data_id",
+            "scraped_data__resource_id",
+            "scraped_data__content_hash",
+        )[:limit]
+    )
+    if len(acknowledged) == limit:
+        position = acknowledged[-1][0]
+    recorder = ConsumptionRecorder()
+    recorder.record(
+        integration,
+        [
+            ScrapedData(pk=data_pk, resource_id=resource_id, content_hash=content_hash)
+            for _, data_pk, resource_id, content_hash in acknowledged
+        ],
+    )
+    recorder.flush()
+    get_queryset(Integration).filter(pk=integration.pk).filter(
+        Q(feed_position__isnull=True) | Q(feed_position__lt=position)
+    ).update(feed_position=position)
+    return len(acknowledged), position
@@ -0,0 +1,49 @@
+from collections.abc import Sequence
+
+from django.db import connections, router
+from django.utils import timezone
+
+from scraper.models import IntegrationConsumption
+
+# Keeps the number of the query parameters within the limits of the databases.
+INSERT_CHUNK_SIZE = 1000
+
+
+def upsert_consumptions(rows: Sequence[tuple[int, int, str]]) -> list[tuple[int, int]]:
+    # Records the integration pk, scraped data pk and the content hash of the consumed
+    # version in a single statement per chunk. Returns the pairs of the pks which
+    # have not been recorded in that version before, also if another task records
+    # the same consumptions concurrently.
+    if not rows:
+        return []
+    meta = IntegrationConsumption._meta
+    connection = connections[router.db_for_write(IntegrationConsumption)]
+    quote = connection.ops.quote_name
+    created = meta.get_field("created").get_db_prep_value(timezone.now(), connection)
+    integration_column = quote(meta.get_field("integration").column)
+    scraped_data_column = quote(meta.get_field("scraped_data").column)
+    content_hash_column = quote(meta.get_field("content_hash").column)
+    table = quote(meta.db_table)
+    inserted = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            chunk = rows[start : start + INSERT_CHUNK_SIZE]
+            values = ", ".join(["(%s, %s, %s, %s)"] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {table} "
+                f"({quote(meta.get_field('created').column)}, "
+                f"{integration_column}, {scraped_data_column}, {content_hash_column}) "
+                f"VALUES {values} "
+                f"ON CONFLICT ({integration_column}, {scraped_data_column}) "
+                f"DO UPDATE SET {content_hash_column} = EXCLUDED.{content_hash_column} "
+                f"WHERE {table}.{content_hash_column} "
+                f"<> EXCLUDED.{content_hash_column} "
+                f"RETURNING {integration_column}, {scraped_data_column}",
+                [
+                    param
+                    for integration_pk, data_pk, content_hash in chunk
+                    for param in (created, integration_pk, data_pk, content_hash)
+                ],
+            )
+            inserted += [tuple(row) for row in cursor.fetchall()]
+    return inserted
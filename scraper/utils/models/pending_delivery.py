@@ -0,0 +1,43 @@
+from collections.abc import Sequence
+
+from django.db import connections, router
+from django.utils import timezone
+
+from scraper.models import PendingDelivery
+
+# Keeps the number of the query parameters within the limits of the databases.
+UPSERT_CHUNK_SIZE = 1000
+
+
+def upsert_pending_deliveries(rows: Sequence[tuple[int, int, int]]) -> int:
+    # Inserts the integration pk, scraped data pk and size of the items, or updates
+    # the size of the items already waiting, which are sent once in their latest version.
+    # A statement cannot update a row twice, so the last size of an item is kept.
+    # The rows are written in the order of their keys, so the relays do not deadlock.
+    sizes = {(integration_pk, data_pk): size for integration_pk, data_pk, size in rows}
+    if not sizes:
+        return 0
+    meta = PendingDelivery._meta
+    connection = connections[router.db_for_write(PendingDelivery)]
+    quote = connection.ops.quote_name
+    created = meta.get_field("created").get_db_prep_value(timezone.now(), connection)
+    integration_column = quote(meta.get_field("integration").column)
+    scraped_data_column = quote(meta.get_field("scraped_data").column)
+    size_column = quote(meta.get_field("size").column)
+    keys = sorted(sizes)
+    written = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(keys), UPSERT_CHUNK_SIZE):
+            chunk = keys[start : start + UPSERT_CHUNK_SIZE]
+            values = ", ".join(["(%s, %s, %s, %s)"] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {quote(meta.db_table)} "
+                f"({quote(meta.get_field('created').column)}, "
+                f"{integration_column}, {scraped_data_column}, {size_column}) "
+                f"VALUES {values} "
+                f"ON CONFLICT ({integration_column}, {scraped_data_column}) "
+                f"DO UPDATE SET {size_column} = EXCLUDED.{size_column}",
+                [param for key in chunk for param in (created, *key, sizes[key])],
+            )
+            written += cursor.rowcount
+    return written
@@ -0,0 +1,252 @@
+import dataclasses
+import gzip
+import json
+import os
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import (
+    Count,
+    Min,
+    Max,
+    Func,
+    F,
+    Sum,
+    QuerySet,
+    Exists,
+    OuterRef,
+    IntegerField,
+)
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from scraper.models import (
+    ScrapedData,
+    Resource,
+    IntegrationConsumption,
+    DeliveryOutbox,
+    PendingDelivery,
+    FeedEntry,
+)
+from scraper.utils.models.misc import get_queryset
+from scraper.utils.models.scraped_data import bump_scraped_data_versions
+
+
+@dataclasses.dataclass(frozen=True)
+class ArchiveSettings:
+    directory: str = "archive"
+    chunk_size: int = 2000
+    # The number of the rows retired in one transaction, into one part of the archive.
+    part_size: int = 10000
+
+    @classmethod
+    def from_settings(cls) -> "ArchiveSettings":
+        from django.conf import settings
+
+        options = getattr(settings, "SCRAPED_DATA_ARCHIVE", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class Bucket:
+    # The scraped data of a resource last modified within a calendar month.
+    # A row changed by a later step moves to a later bucket.
+    resource_id: int
+    month: datetime
+    rows: int
+    size: Optional[int] = None
+    oldest: Optional[datetime] = None
+    newest: Optional[datetime] = None
+
+    @property
+    def end(self) -> datetime:
+        return get_next_month(self.month)
+
+
+def get_next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def get_bucket_queryset(resource_id: int, month: datetime) -> QuerySet[ScrapedData]:
+    # The items still waiting to be delivered are kept until they are delivered.
+    return get_queryset(ScrapedData).filter(
+        ~Exists(get_queryset(DeliveryOutbox).filter(scraped_data=OuterRef("pk"))),
+        ~Exists(get_queryset(PendingDelivery).filter(scraped_data=OuterRef("pk"))),
+        resource_id=resource_id,
+        modified__gte=month,
+        modified__lt=get_next_month(month),
+    )
+
+
+def get_buckets(queryset: Optional[QuerySet[ScrapedData]] = None) -> list[Bucket]:
+    queryset = get_queryset(ScrapedData) if queryset is None else queryset
+    aggregates = {
+        "rows": Count("id"),
+        "oldest": Min("modified"),
+        "newest": Max("modified"),
+    }
+    if connections[queryset.db].vendor == "postgresql":
+        aggregates["size"] = Sum(
+            Func(F("data"), function="pg_column_size", output_field=IntegerField())
+        )
+    return [
+        Bucket(**values)
+        for values in queryset.annotate(month=TruncMonth("modified"))
+        .order_by("resource_id", "month")
+        .values("resource_id", "month")
+        .annotate(**aggregates)
+    ]
+
+
+def get_expired_buckets(
+    resource: Resource, now: Optional[datetime] = None
+) -> list[Bucket]:
+    # Only the whole months older than the retention period expire. The rows are
+    # bucketed by their last change, so a row changed recently never expires.
+    if resource.retention_days is None:
+        return []
+    cutoff = (now or timezone.now()) - timedelta(days=resource.retention_days)
+    return [
+        bucket
+        for bucket in get_buckets(
+            get_queryset(ScrapedData).filter(resource=resource, modified__lt=cutoff)
+        )
+        if bucket.end <= cutoff
+    ]
+
+
+def get_archive_path(
+    directory: str, bucket: Bucket, name: str = "", part: int = 0
+) -> Path:
+    return (
+        Path(directory)
+        / f"resource-{bucket.resource_id}"
+        / f"{bucket.month:%Y-%m}{f'.{part}' if part else ''}{name}.jsonl.gz"
+    )
+
+
+def get_archive_part(directory: str, bucket: Bucket) -> int:
+    # The rows kept back until they are delivered are archived later, next to
+    # the part of the bucket archived before.
+    part = 0
+    while get_archive_path(directory, bucket, part=part).exists():
+        part += 1
+    return part
+
+
+def write_json_lines(path: Path, rows: Iterable[dict]):
+    # The archive is written aside and renamed, so a complete file is never mistaken
+    # for a partial one left by an interrupted run.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_suffix(".partial")
+    with open(partial_path, "wb") as file:
+        with gzip.open(file, "wt", encoding="utf-8") as archive:
+            for row in rows:
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder))
+                archive.write("\n")
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(partial_path, path)
+
+
+def get_bucket_part(bucket: Bucket, size: int) -> list[int]:
+    # The oldest rows of the bucket come first, read by the index on the last change,
+    # the retired rows are deleted, so the next part starts from the beginning again.
+    return list(
+        get_bucket_queryset(bucket.resource_id, bucket.month)
+        .order_by("modified")
+        .select_for_update(of=("self",))
+        .values_list("pk", flat=True)[:size]
+    )
+
+
+def archive_part(
+    bucket: Bucket, pks: list[int], settings: Optional[ArchiveSettings] = None
+) -> list[Path]:
+    settings = ArchiveSettings.from_settings() if settings is None else settings
+    part = get_archive_part(settings.directory, bucket)
+    scraped_data_path = get_archive_path(settings.directory, bucket, part=part)
+    write_json_lines(
+        scraped_data_path,
+        get_queryset(ScrapedData)
+        .filter(pk__in=pks)
+        .order_by("pk")
+        .values(
+            "id",
+            "resource_id",
+            "natural_key",
+            "content_hash",
+            "data",
+            "created",
+            "modified",
+        )
+        .iterator(chunk_size=settings.chunk_size),
+    )
+    consumptions_path = get_archive_path(
+        settings.directory, bucket, ".consumptions", part=part
+    )
+    write_json_lines(
+        consumptions_path,
+        get_queryset(IntegrationConsumption)
+        .filter(scraped_data__in=pks)
+        .order_by("pk")
+        .values("id", "integration_id", "scraped_data_id", "content_hash", "created")
+        .iterator(chunk_size=settings.chunk_size),
+    )
+    return [scraped_data_path, consumptions_path]
+
+
+def delete_in(queryset: QuerySet, field: str, values: QuerySet, using: str) -> int:
+    # A single DELETE statement, the rows are not loaded and no signals are sent.
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    column = queryset.model._meta.get_field(field).column
+    subquery, params = values.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote_name(queryset.model._meta.db_table)} "
+            f"WHERE {quote_name(column)} IN ({subquery})",
+            params,
+        )
+        return cursor.rowcount
+
+
+def delete_part(bucket: Bucket, pks: list[int]) -> int:
+    # Only the consumptions, the feed entries and the scraped data are deleted, the rows
+    # referenced by the outbox or the pending deliveries are not in the bucket.
+    using = router.db_for_write(ScrapedData)
+    values = get_queryset(ScrapedData).filter(pk__in=pks).values("pk")
+    with transaction.atomic(using=using):
+        for model in (IntegrationConsumption, FeedEntry):
+            delete_in(get_queryset(model), "scraped_data", values, using)
+        bump_scraped_data_versions((bucket.resource_id,))
+        return delete_in(get_queryset(ScrapedData), "id", values, using)
+
+
+def retire_bucket(
+    bucket: Bucket, settings: Optional[ArchiveSettings] = None
+) -> tuple[list[Path], int]:
+    # The bucket is retired part by part, each in its own short transaction, so the
+    # table is never locked for long. The rows of a part are locked before they are
+    # archived, so no row is changed or delivered between the archive and the delete.
+    # If the delete fails, the rows are kept, and archived again into the next part.
+    settings = ArchiveSettings.from_settings() if settings is None else settings
+    using = router.db_for_write(ScrapedData)
+    paths, deleted = [], 0
+    while True:
+        with transaction.atomic(using=using):
+            pks = get_bucket_part(bucket, settings.part_size)
+            if not pks:
+                return paths, deleted
+            paths += archive_part(bucket, pks, settings)
+            deleted += delete_part(bucket, pks)
@@ -1,10 +1,44 @@
+import hashlib
+import json
+import secrets
+from collections.abc import Sequence, Iterable
 from typing import Optional
 
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
 from django.db.models import QuerySet
+from django.utils import timezone
 
-from scraper.models import ScrapedData
+from scraper.models import ScrapedData, Resource
 from scraper.utils.models.misc import get_queryset, get_default_manager
 
+SCRAPED_DATA_VERSION_CACHE_KEY = "scraper:scraped-data:{scope}:version"
+
+
+def get_scraped_data_version(resource_id: Optional[int] = None) -> int:
+    # The version of all the scraped data is used if no resource is given.
+    # A missing version starts from a random number, like the configuration versions.
+    return cache.get_or_set(
+        SCRAPED_DATA_VERSION_CACHE_KEY.format(scope=resource_id or "all"),
+        lambda: secrets.randbits(31),
+        timeout=None,
+    )
+
+
+def bump_scraped_data_versions(resource_ids: Iterable[int]):
+    scopes = (*set(resource_ids), "all")
+
+    def bump():
+        for scope in scopes:
+            try:
+                cache.incr(SCRAPED_DATA_VERSION_CACHE_KEY.format(scope=scope))
+            except ValueError:
+                pass
+
+    # The readers must not cache the data of the version before it has been committed.
+    transaction.on_commit(bump, using=router.db_for_write(ScrapedData))
+
 
 def get_scraped_data_by_pk(pk: int) -> Optional[ScrapedData]:
     qs = get_queryset(ScrapedData)
@@ -27,3 +61,68 @@ def get_scraped_data_by_pk_list(pk_list: list[int]) -> Optional[QuerySet[Scraped
         .prefetch_related("resource__topic__integrations")
         .filter(pk__in=pk_list)
     ).distinct()
+
+
+def get_content_hash(data: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    ).hexdigest()
+
+
+def upsert_scraped_data(
+    resource: Resource, items: Sequence[tuple[str, dict]]
+) -> tuple[list[ScrapedData], int]:
+    # Inserts the new items and updates the changed ones in a single statement.
+    # Only these are returned, along with the number of the unchanged items.
+    # A row cannot be affected twice by one statement, so the last duplicate wins.
+    items = dict(items)
+    if not items:
+        return [], 0
+    meta = ScrapedData._meta
+    connection = connections[router.db_for_write(ScrapedData)]
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    columns = [
+        meta.get_field(name)
+        for name in ("created", "modified", "resource", "natural_key", "content_hash")
+    ]
+    data_field = meta.get_field("data")
+    now = timezone.now()
+    params = []
+    for natural_key, data in items.items():
+        params += [
+            *(
+                column.get_db_prep_value(value, connection)
+                for column, value in zip(
+                    columns,
+                    (now, now, resource.pk, natural_key, get_content_hash(data)),
+                )
+            ),
+            data_field.get_db_prep_value(data, connection),
+        ]
+    column_names = ", ".join(quote(column.column) for column in columns + [data_field])
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(items))
+    resource_column = quote(meta.get_field("resource").column)
+    natural_key_column = quote(meta.get_field("natural_key").column)
+    content_hash_column = quote(meta.get_field("content_hash").column)
+    sql = (
+        f"INSERT INTO {table} ({column_names}) VALUES {values} "
+        f"ON CONFLICT ({resource_column}, {natural_key_column}) "
+        f"WHERE {natural_key_column} IS NOT NULL "
+        f"DO UPDATE SET "
+        f"{quote(data_field.column)} = EXCLUDED.{quote(data_field.column)}, "
+        f"{content_hash_column} = EXCLUDED.{content_hash_column}, "
+        f"{quote(meta.get_field('modified').column)} = "
+        f"EXCLUDED.{quote(meta.get_field('modified').column)} "
+        f"WHERE {table}.{content_hash_column} <> EXCLUDED.{content_hash_column} "
+        f"RETURNING {quote(meta.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        pk_list = [row[0] for row in cursor.fetchall()]
+    if pk_list:
+        bump_scraped_data_versions((resource.pk,))
+    scraped_data = list(
+        get_default_manager(ScrapedData).filter(pk__in=pk_list).order_by("pk")
+    )
+    return scraped_data, len(items) - len(pk_list)
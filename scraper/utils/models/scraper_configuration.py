@@ -0,0 +1,131 @@
+import copy
+import dataclasses
+import secrets
+from collections.abc import Iterable
+from datetime import timedelta
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from scraper.models import ScraperConfiguration
+from scraper.utils.models.misc import get_queryset, get_object_or_none
+
+CONFIGURATION_VERSION_CACHE_KEY = "scraper:configuration:{scraper_name}:version"
+
+
+@dataclasses.dataclass(frozen=True)
+class ConfigurationSnapshot:
+    # The configuration with its resource and topic, as of the version.
+    configuration: ScraperConfiguration
+    version: int
+
+    def get_configuration(self) -> ScraperConfiguration:
+        # The snapshot is shared by the steps run in the worker, the copy can be modified.
+        return copy.copy(self.configuration)
+
+
+_snapshots: dict[str, ConfigurationSnapshot] = {}
+
+
+def get_configuration_version(scraper_name: str) -> int:
+    # A missing version starts from a random number,
+    # so it does not match the snapshots taken before it has been evicted.
+    return cache.get_or_set(
+        CONFIGURATION_VERSION_CACHE_KEY.format(scraper_name=scraper_name),
+        lambda: secrets.randbits(31),
+        timeout=None,
+    )
+
+
+def bump_configuration_version(scraper_name: str) -> Optional[int]:
+    try:
+        return cache.incr(
+            CONFIGURATION_VERSION_CACHE_KEY.format(scraper_name=scraper_name)
+        )
+    except ValueError:
+        # There is no version to bump, so no snapshot can be valid.
+        return None
+
+
+def bump_configuration_versions(scraper_names: Iterable[str]):
+    for scraper_name in scraper_names:
+        bump_configuration_version(scraper_name)
+
+
+def get_configuration_snapshot(scraper_name: str) -> Optional[ConfigurationSnapshot]:
+    # The version is read before the configuration,
+    # so a change made in between invalidates the snapshot.
+    version = get_configuration_version(scraper_name)
+    snapshot = _snapshots.get(scraper_name)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    configuration = get_object_or_none(
+        get_queryset(ScraperConfiguration).select_related("resource__topic"),
+        scraper_name=scraper_name,
+    )
+    if configuration is None:
+        _snapshots.pop(scraper_name, None)
+        return None
+    snapshot = _snapshots[scraper_name] = ConfigurationSnapshot(
+        configuration=configuration, version=version
+    )
+    return snapshot
+
+
+def update_configuration_snapshot(configuration: ScraperConfiguration):
+    # Called after the worker has saved the configuration itself.
+    # The snapshot is kept only if no other change has been made in the meantime.
+    snapshot = _snapshots.pop(configuration.scraper_name, None)
+    version = bump_configuration_version(configuration.scraper_name)
+    if snapshot is not None and version == snapshot.version + 1:
+        _snapshots[configuration.scraper_name] = ConfigurationSnapshot(
+            configuration=copy.copy(configuration), version=version
+        )
+
+
+def acquire_lease(scraper_name: str, timeout: timedelta) -> Optional[int]:
+    # The lease is taken with a single conditional update, so only one of the concurrent
+    # steps gets it. The incremented token fences the writes of the previous holders.
+    now = timezone.now()
+    queryset = get_queryset(ScraperConfiguration).filter(scraper_name=scraper_name)
+    with transaction.atomic():
+        acquired = queryset.filter(
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now)
+        ).update(
+            lease_token=F("lease_token") + 1,
+            lease_expires_at=now + timeout,
+            # The released step has started, the scheduler can release the next one
+            # once the lease is given back.
+            released_at=None,
+        )
+        if not acquired:
+            # The released step is dropped, it does not block the next one either.
+            queryset.update(released_at=None)
+            return None
+        # The updated row stays locked until the commit, so the token is the one just set.
+        return queryset.values_list("lease_token", flat=True).get()
+
+
+def release_lease(scraper_name: str, lease_token: int) -> bool:
+    return bool(
+        get_queryset(ScraperConfiguration)
+        .filter(scraper_name=scraper_name, lease_token=lease_token)
+        .update(lease_expires_at=None)
+    )
+
+
+def update_fenced(
+    configuration: ScraperConfiguration, lease_token: int, *fields: str
+) -> bool:
+    # Nothing is written if the lease has been taken over by another step.
+    configuration.modified = timezone.now()
+    return bool(
+        get_queryset(ScraperConfiguration)
+        .filter(pk=configuration.pk, lease_token=lease_token)
+        .update(
+            **{field: getattr(configuration, field) for field in (*fields, "modified")}
+        )
+    )
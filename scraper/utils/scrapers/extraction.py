@@ -0,0 +1,72 @@
+import dataclasses
+from typing import Optional
+
+from selenium.webdriver.common.by import By
+
+__all__ = ("Field", "EXTRACT_SCRIPT")
+
+
+@dataclasses.dataclass(frozen=True)
+class Field:
+    # The selectors of the fields are evaluated relatively to their container,
+    # so the XPath expressions of the fields should start with a dot.
+    selector: str
+    by: str = By.XPATH
+    # The text of the element is extracted when no attribute is given.
+    attribute: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+# Extracts the fields of all the containers in a single WebDriver command.
+# The attributes are read the way ``WebElement.get_attribute`` does,
+# so e.g. the ``href`` is an absolute url.
+EXTRACT_SCRIPT = """
+const [container, fields] = arguments;
+
+function findAll(root, field) {
+    if (field.by === "xpath") {
+        const result = document.evaluate(
+            field.selector, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        const nodes = [];
+        for (let i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+        return nodes;
+    }
+    return Array.from(root.querySelectorAll(field.selector));
+}
+
+function findOne(root, field) {
+    if (field.by === "xpath") {
+        return document.evaluate(
+            field.selector, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+    }
+    return root.querySelector(field.selector);
+}
+
+function read(node, field) {
+    if (node === null) {
+        return null;
+    }
+    if (field.attribute === null) {
+        return node.innerText.trim();
+    }
+    const property = node[field.attribute];
+    if (property !== undefined && property !== null && typeof property !== "object") {
+        return String(property);
+    }
+    return node.getAttribute(field.attribute);
+}
+
+return findAll(document, container).map((node) => {
+    const item = {};
+    for (const [name, field] of Object.entries(fields)) {
+        item[name] = read(findOne(node, field), field);
+    }
+    return item;
+});
+"""
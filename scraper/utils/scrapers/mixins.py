@@ -1,4 +1,9 @@
-from typing import TypeVar, Protocol
+import asyncio
+import importlib.util
+import logging
+from collections.abc import Sequence, Iterator
+from contextlib import contextmanager
+from typing import TypeVar, Protocol, Optional, cast, TYPE_CHECKING
 
 import httpx
 import bs4
@@ -6,20 +11,59 @@ from selenium import webdriver
 from selenium.webdriver.common.options import BaseOptions
 from selenium.webdriver.remote.webdriver import BaseWebDriver
 
+from scraper.utils.client.client import AsyncHttpClient
+from scraper.utils.client.pool import run_in_event_loop
+from scraper.utils.scrapers.extraction import Field, EXTRACT_SCRIPT
+from scraper.utils.scrapers.pool import get_driver_pool
+
+if TYPE_CHECKING:
+    from scraper.scrapers.base import Scraper
+
 DriverType = TypeVar("DriverType", bound=BaseWebDriver)
 DriverOptionsType = TypeVar("DriverOptionsType", bound=BaseOptions)
 
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+logger = logging.getLogger("django")
+
 
 class ClientMixin:
+    http_headers: dict[str, str] = {
+        "User-Agent": (
+            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/101.0.4951.54 Safari/537.36"
+        ),
+    }
+
     @staticmethod
     def get_http_client(*args, **kwargs) -> httpx.Client:
         return httpx.Client(*args, **kwargs)
 
+    def get_async_http_client(self, **kwargs) -> AsyncHttpClient:
+        return AsyncHttpClient(**({"headers": self.http_headers} | kwargs))
+
+    def fetch_pages(self, urls: Sequence[str]) -> list[Optional[str]]:
+        # The pages are fetched concurrently over the pooled connections,
+        # the concurrency per host is bounded by the pool.
+        client = self.get_async_http_client(logger=logger)
+
+        async def fetch(url: str):
+            await cast("Scraper", self).async_throttle(url)
+            return await client.get(url=url, request_kwargs={"follow_redirects": True})
+
+        async def fetch_all():
+            return await asyncio.gather(*(fetch(url) for url in urls))
+
+        return [
+            None if response is None else response.text
+            for response in run_in_event_loop(fetch_all())
+        ]
+
 
 class BeautifulSoupMixin:
     @staticmethod
-    def get_beautiful_soup(*args, **kwargs) -> bs4.BeautifulSoup:
-        return bs4.BeautifulSoup(*args, **kwargs)
+    def get_beautiful_soup(markup, features=HTML_PARSER, **kwargs) -> bs4.BeautifulSoup:
+        return bs4.BeautifulSoup(markup, features, **kwargs)
 
 
 class DriverProvider(Protocol[DriverType, DriverOptionsType]):
@@ -29,6 +73,26 @@ class DriverProvider(Protocol[DriverType, DriverOptionsType]):
     def get_remote_driver(self) -> DriverType:
         ...
 
+    @contextmanager
+    def leased_driver(self) -> Iterator[DriverType]:
+        pool = get_driver_pool(type(self), self.get_remote_driver)
+        with pool.lease() as driver:
+            yield driver
+
+    def open_page(self, driver: DriverType, url: str):
+        cast("Scraper", self).throttle(url)
+        driver.get(url)
+
+    @staticmethod
+    def extract(
+        driver: DriverType, container: Field, fields: dict[str, Field]
+    ) -> list[dict[str, Optional[str]]]:
+        return driver.execute_script(
+            EXTRACT_SCRIPT,
+            container.as_dict(),
+            {name: field.as_dict() for name, field in fields.items()},
+        )
+
     def _get_remote_driver_options(self) -> DriverOptionsType:
         ...
 
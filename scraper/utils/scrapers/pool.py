@@ -0,0 +1,274 @@
+import dataclasses
+import logging
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable, Hashable
+from contextlib import contextmanager
+from typing import Generic, Optional, TypeVar
+
+from django.core.cache import cache
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import BaseWebDriver
+
+__all__ = (
+    "DriverPoolOptions",
+    "DriverPool",
+    "get_driver_pool",
+    "close_driver_pools",
+)
+
+DriverType = TypeVar("DriverType", bound=BaseWebDriver)
+
+logger = logging.getLogger("django")
+
+SESSION_SLOTS_CACHE_KEY = "scraper:selenium:sessions"
+
+RESET_STORAGE_SCRIPT = """
+try {
+    window.localStorage.clear();
+    window.sessionStorage.clear();
+} catch (e) {}
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class DriverPoolOptions:
+    # The sessions of a single worker process.
+    max_size: int = 3
+    # The sessions of all the processes sharing the cache, so the grid is never
+    # asked for more than it has. Not limited if None.
+    max_sessions: Optional[int] = None
+    max_uses: int = 50
+    max_age: float = 30 * 60
+    # An idle session is closed after it, and gives its slot back to the other processes.
+    max_idle: float = 60
+    acquire_timeout: float = 5 * 60
+    poll_interval: float = 1
+
+    @classmethod
+    def from_settings(cls) -> "DriverPoolOptions":
+        from django.conf import settings
+
+        options = getattr(settings, "SELENIUM_DRIVER_POOL", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class SessionSlot:
+    key: str
+    token: str
+
+
+class SessionSlots:
+    # A semaphore kept in the cache, which must be shared by the worker processes.
+    # The slots expire, so the ones of a crashed process are eventually given back.
+    def __init__(self, size: int, key_prefix: str = SESSION_SLOTS_CACHE_KEY):
+        self.size = size
+        self.key_prefix = key_prefix
+
+    def try_acquire(self, timeout: float) -> Optional[SessionSlot]:
+        token = uuid.uuid4().hex
+        for number in range(self.size):
+            key = f"{self.key_prefix}:{number}"
+            if cache.add(key, token, timeout=timeout):
+                return SessionSlot(key=key, token=token)
+        return None
+
+    def acquire(
+        self, timeout: float, deadline: float, poll_interval: float
+    ) -> SessionSlot:
+        while (slot := self.try_acquire(timeout)) is None:
+            if time.monotonic() >= deadline:
+                raise RuntimeError(
+                    f"All the {self.size} remote driver sessions are in use."
+                )
+            time.sleep(poll_interval)
+        return slot
+
+    @staticmethod
+    def renew(slot: SessionSlot, timeout: float):
+        if cache.get(slot.key) == slot.token:
+            cache.touch(slot.key, timeout=timeout)
+
+    @staticmethod
+    def release(slot: SessionSlot):
+        if cache.get(slot.key) == slot.token:
+            cache.delete(slot.key)
+
+
+@dataclasses.dataclass
+class PooledDriver(Generic[DriverType]):
+    driver: DriverType
+    created: float = dataclasses.field(default_factory=time.monotonic)
+    uses: int = 0
+    idle_since: Optional[float] = None
+    slot: Optional[SessionSlot] = None
+
+    def is_expired(self, options: DriverPoolOptions) -> bool:
+        now = time.monotonic()
+        return (
+            self.uses >= options.max_uses
+            or now - self.created >= options.max_age
+            or (
+                self.idle_since is not None
+                and now - self.idle_since >= options.max_idle
+            )
+        )
+
+    def is_healthy(self) -> bool:
+        try:
+            getattr(self.driver, "current_url")
+            return True
+        except WebDriverException:
+            return False
+
+    def reset(self):
+        # Only the cookies and the storage of the last visited site can be cleared,
+        # which are the ones a scraping step has left behind.
+        self.driver.delete_all_cookies()
+        self.driver.execute_script(RESET_STORAGE_SCRIPT)
+        self.driver.get("about:blank")
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except WebDriverException as exc:
+            logger.warning(f"Cannot quit a remote driver session: {exc}")
+
+
+class DriverPool(Generic[DriverType]):
+    def __init__(self, factory: Callable[[], DriverType], options: DriverPoolOptions):
+        self.factory = factory
+        self.options = options
+        self._idle: list[PooledDriver[DriverType]] = []
+        self._size = 0
+        self._condition = threading.Condition()
+        self._slots = (
+            None if options.max_sessions is None else SessionSlots(options.max_sessions)
+        )
+
+    def __release_slot(self, slot: Optional[SessionSlot]):
+        if self._slots is not None and slot is not None:
+            self._slots.release(slot)
+
+    def __discard(self, pooled: PooledDriver[DriverType]):
+        pooled.quit()
+        self.__release_slot(pooled.slot)
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def __take_idle(self, deadline: float) -> Optional[PooledDriver[DriverType]]:
+        with self._condition:
+            while not self._idle and self._size >= self.options.max_size:
+                if not self._condition.wait(timeout=deadline - time.monotonic()):
+                    raise RuntimeError(
+                        f"Cannot acquire a remote driver session "
+                        f"within {self.options.acquire_timeout} seconds."
+                    )
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+            return None
+
+    def acquire(self) -> PooledDriver[DriverType]:
+        deadline = time.monotonic() + self.options.acquire_timeout
+        while (pooled := self.__take_idle(deadline)) is not None:
+            if not pooled.is_expired(self.options) and pooled.is_healthy():
+                pooled.idle_since = None
+                if self._slots is not None and pooled.slot is not None:
+                    self._slots.renew(pooled.slot, timeout=self.options.max_age)
+                return pooled
+            self.__discard(pooled)
+        slot = None
+        try:
+            if self._slots is not None:
+                slot = self._slots.acquire(
+                    timeout=self.options.max_age,
+                    deadline=deadline,
+                    poll_interval=self.options.poll_interval,
+                )
+            return PooledDriver(driver=self.factory(), slot=slot)
+        except Exception:
+            self.__release_slot(slot)
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, pooled: PooledDriver[DriverType], discard: bool = False):
+        pooled.uses += 1
+        if not discard and not pooled.is_expired(self.options):
+            try:
+                pooled.reset()
+            except WebDriverException as exc:
+                logger.warning(f"Cannot reset a remote driver session: {exc}")
+            else:
+                pooled.idle_since = time.monotonic()
+                if self._slots is not None and pooled.slot is not None:
+                    # The slot of an idle session outlives it by the idle time only.
+                    self._slots.renew(pooled.slot, timeout=self.options.max_idle)
+                with self._condition:
+                    self._idle.append(pooled)
+                    self._condition.notify()
+                return
+        self.__discard(pooled)
+
+    @contextmanager
+    def lease(self):
+        pooled = self.acquire()
+        try:
+            yield pooled.driver
+        except Exception:
+            # The session can be left in an unknown state.
+            self.release(pooled, discard=True)
+            raise
+        else:
+            self.release(pooled)
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for pooled in idle:
+            pooled.quit()
+            self.__release_slot(pooled.slot)
+
+
+_pools: dict[Hashable, DriverPool] = {}
+_pools_pid: Optional[int] = None
+_pools_lock = threading.Lock()
+
+
+def get_driver_pool(
+    key: Hashable,
+    factory: Callable[[], DriverType],
+    options: Optional[DriverPoolOptions] = None,
+) -> DriverPool[DriverType]:
+    global _pools_pid
+
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if key not in _pools:
+            _pools[key] = DriverPool(
+                factory,
+                DriverPoolOptions.from_settings() if options is None else options,
+            )
+        return _pools[key]
+
+
+def close_driver_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
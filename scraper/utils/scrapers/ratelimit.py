@@ -0,0 +1,178 @@
+import asyncio
+import dataclasses
+import os
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from django.utils.module_loading import import_string
+
+__all__ = (
+    "Rate",
+    "RateLimiter",
+    "InMemoryRateLimiterBackend",
+    "RedisRateLimiterBackend",
+    "get_domain",
+    "get_rate_limiter",
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Rate:
+    # The number of the requests per second sustained in the long run.
+    rate: float
+    # The number of the requests which can be sent at once after an idle period.
+    burst: float = 1
+
+    def __post_init__(self):
+        if self.rate <= 0:
+            raise ValueError(f"The rate must be positive, got {self.rate}.")
+        if self.burst < 1:
+            raise ValueError(f"The burst must be at least 1, got {self.burst}.")
+
+    @classmethod
+    def parse(cls, value) -> "Rate":
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls(**{key.lower(): option for key, option in value.items()})
+        return cls(rate=float(value))
+
+
+class RateLimiterBackend:
+    # The backends implement a token bucket which lets a request reserve a token
+    # even if the bucket is empty. The caller then sleeps until the token is produced,
+    # so the waiting requests are served in order, without polling the bucket.
+    def reserve(self, key: str, rate: Rate) -> float:
+        raise NotImplementedError
+
+
+class InMemoryRateLimiterBackend(RateLimiterBackend):
+    # Limits the requests of a single process only.
+    def __init__(self, **options):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: Rate) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, (rate.burst, now))
+            tokens = min(rate.burst, tokens + (now - updated) * rate.rate) - 1
+            self._buckets[key] = (tokens, now)
+        return max(0.0, -tokens / rate.rate)
+
+
+# The clock of the Redis server is used, so the buckets are shared by the whole cluster.
+RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate) - 1
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return tostring(math.max(0, -tokens / rate))
+"""
+
+
+class RedisRateLimiterBackend(RateLimiterBackend):
+    def __init__(
+        self, location: str, key_prefix: str = "scraper:ratelimit:", **options
+    ):
+        import redis
+
+        self.key_prefix = key_prefix
+        self._client = redis.Redis.from_url(location, **options)
+        self._script = self._client.register_script(RESERVE_SCRIPT)
+
+    def reserve(self, key: str, rate: Rate) -> float:
+        return float(
+            self._script(keys=[f"{self.key_prefix}{key}"], args=[rate.rate, rate.burst])
+        )
+
+
+def get_domain(url: str) -> str:
+    domain = (urlsplit(url).hostname or "").lower()
+    return domain.removeprefix("www.")
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        backend: RateLimiterBackend,
+        default_rate: Optional[Rate] = None,
+        domains: Optional[dict[str, Rate]] = None,
+    ):
+        self.backend = backend
+        self.default_rate = default_rate
+        self.domains = domains or {}
+
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        from django.conf import settings
+
+        options = getattr(settings, "SCRAPING_RATE_LIMITER", {})
+        backend_cls = import_string(
+            options.get(
+                "BACKEND",
+                "scraper.utils.scrapers.ratelimit.InMemoryRateLimiterBackend",
+            )
+        )
+        default_rate = options.get("DEFAULT_RATE")
+        return cls(
+            backend=backend_cls(**options.get("OPTIONS", {})),
+            default_rate=None if default_rate is None else Rate.parse(default_rate),
+            domains={
+                domain: Rate.parse(rate)
+                for domain, rate in options.get("DOMAINS", {}).items()
+            },
+        )
+
+    def get_bucket(self, url: str) -> tuple[str, Optional[Rate]]:
+        # The subdomains share the bucket of the configured domain, e.g. m.olx.pl and olx.pl.
+        domain = get_domain(url)
+        for configured in self.domains:
+            if domain == configured or domain.endswith(f".{configured}"):
+                return configured, self.domains[configured]
+        return domain, self.default_rate
+
+    def reserve(self, url: str, rate: Optional[Rate] = None) -> float:
+        # The rate given by the caller, e.g. the one of a resource, overrides the settings.
+        domain, configured_rate = self.get_bucket(url)
+        rate = rate or configured_rate
+        if rate is None or not domain:
+            return 0.0
+        return self.backend.reserve(domain, rate)
+
+    def wait(self, url: str, rate: Optional[Rate] = None) -> float:
+        delay = self.reserve(url, rate)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def async_wait(self, url: str, rate: Optional[Rate] = None) -> float:
+        delay = await asyncio.get_running_loop().run_in_executor(
+            None, self.reserve, url, rate
+        )
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_pid: Optional[int] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter, _rate_limiter_pid
+
+    with _rate_limiter_lock:
+        if _rate_limiter_pid != os.getpid():
+            _rate_limiter = RateLimiter.from_settings()
+            _rate_limiter_pid = os.getpid()
+        return _rate_limiter
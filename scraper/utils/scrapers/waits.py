@@ -0,0 +1,71 @@
+import time
+from collections.abc import Callable
+from typing import Optional, TypeVar
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import BaseWebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.wait import WebDriverWait
+
+__all__ = ("WaitStrategy",)
+
+R = TypeVar("R")
+
+Locator = tuple[str, str]
+
+
+class WaitStrategy:
+    # The implicit wait is disabled, so a lookup of a missing element never blocks
+    # unless an explicit wait has been requested for it.
+    def __init__(
+        self,
+        driver: BaseWebDriver,
+        timeout: float = 10,
+        poll_frequency: float = 0.2,
+    ):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.waited = 0.0
+        self.driver.implicitly_wait(0)
+
+    def until(
+        self,
+        condition: Callable[[BaseWebDriver], R],
+        timeout: Optional[float] = None,
+        message: str = "",
+    ) -> R:
+        started = time.monotonic()
+        try:
+            return WebDriverWait(
+                self.driver,
+                self.timeout if timeout is None else timeout,
+                poll_frequency=self.poll_frequency,
+            ).until(condition, message)
+        finally:
+            self.waited += time.monotonic() - started
+
+    def until_ready(
+        self, locator: Locator, timeout: Optional[float] = None
+    ) -> list[WebElement]:
+        return self.until(
+            expected_conditions.presence_of_all_elements_located(locator),
+            timeout=timeout,
+            message=f"The page is not ready, {locator=} has not been found.",
+        )
+
+    def find(
+        self, by: str = By.XPATH, value: str = "", timeout: Optional[float] = None
+    ) -> WebElement:
+        return self.until(
+            expected_conditions.presence_of_element_located((by, value)),
+            timeout=timeout,
+            message=f"Cannot find an element by {by=} and {value=}.",
+        )
+
+    def find_optional(
+        self, by: str = By.XPATH, value: str = ""
+    ) -> Optional[WebElement]:
+        elements = self.driver.find_elements(by=by, value=value)
+        return elements[0] if elements else None
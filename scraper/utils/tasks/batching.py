@@ -0,0 +1,145 @@
+import dataclasses
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.db import router, transaction
+from django.db.models import Count, Min, Sum, F
+from django.utils import timezone
+
+from scraper.models import PendingDelivery
+from scraper.utils.models.integration import get_push_integrations
+from scraper.utils.models.misc import get_queryset
+from scraper.utils.models.pending_delivery import upsert_pending_deliveries
+
+logger = logging.getLogger("django")
+
+
+@dataclasses.dataclass(frozen=True)
+class PendingBatch:
+    integration_id: int
+    items: int
+    size: int
+    oldest: datetime
+    max_items: int
+    max_bytes: int
+    max_latency: float
+
+    def is_due(self, now: datetime) -> bool:
+        return (
+            self.items >= self.max_items
+            or self.size >= self.max_bytes
+            or now - self.oldest >= timedelta(seconds=self.max_latency)
+        )
+
+
+def get_topic_integrations(topic_ids: Iterable[int]) -> dict[int, list[int]]:
+    integrations: dict[int, list[int]] = {}
+    for pk, topic_id in (
+        get_push_integrations()
+        .filter(topic_id__in=set(topic_ids))
+        .values_list("pk", "topic_id")
+    ):
+        integrations.setdefault(topic_id, []).append(pk)
+    return integrations
+
+
+def add_pending_deliveries(items: Iterable[tuple[int, int, int]]) -> int:
+    # The items are the scraped data pk, its topic pk and size. An item already
+    # waiting for an integration is not added twice, it is sent once in its latest
+    # version, so its size is updated to the one of that version.
+    items = list(items)
+    integrations = get_topic_integrations(topic_id for _, topic_id, _ in items)
+    return upsert_pending_deliveries(
+        [
+            (integration_pk, data_pk, size)
+            for data_pk, topic_id, size in items
+            for integration_pk in integrations.get(topic_id, ())
+        ]
+    )
+
+
+def get_pending_batches() -> list[PendingBatch]:
+    return [
+        PendingBatch(**values)
+        for values in get_queryset(PendingDelivery)
+        .order_by()
+        .values("integration_id")
+        .annotate(
+            items=Count("id"),
+            size=Sum("size"),
+            oldest=Min("created"),
+            max_items=F("integration__batch_max_items"),
+            max_bytes=F("integration__batch_max_bytes"),
+            max_latency=F("integration__batch_max_latency"),
+        )
+    ]
+
+
+def split_batch(
+    pending: list[tuple[int, int, int]], max_items: int, max_bytes: int
+) -> list[list[tuple[int, int, int]]]:
+    # A chunk holds at least one item, even if the item alone exceeds the size limit.
+    chunks: list[list[tuple[int, int, int]]] = []
+    chunk, chunk_size = [], 0
+    for item in pending:
+        if chunk and (len(chunk) >= max_items or chunk_size + item[2] > max_bytes):
+            chunks.append(chunk)
+            chunk, chunk_size = [], 0
+        chunk.append(item)
+        chunk_size += item[2]
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def get_due_chunks(
+    batch: PendingBatch, pending: list[tuple[int, int, int]], now: datetime
+) -> list[list[tuple[int, int, int]]]:
+    chunks = split_batch(pending, batch.max_items, batch.max_bytes)
+    # The last chunk is not full, it keeps waiting unless it is already late.
+    if (
+        chunks
+        and now - batch.oldest < timedelta(seconds=batch.max_latency)
+        and len(chunks[-1]) < batch.max_items
+        and sum(size for *_, size in chunks[-1]) < batch.max_bytes
+    ):
+        chunks.pop()
+    return chunks
+
+
+def flush_batch(batch: PendingBatch, now: datetime) -> int:
+    from scraper.tasks import deliver_batch
+
+    with transaction.atomic(using=router.db_for_write(PendingDelivery)):
+        pending = list(
+            get_queryset(PendingDelivery)
+            .select_for_update(skip_locked=True, of=("self",))
+            .filter(integration_id=batch.integration_id)
+            .order_by("pk")
+            .values_list("pk", "scraped_data_id", "size")
+        )
+        chunks = get_due_chunks(batch, pending, now)
+        if not chunks:
+            return 0
+        with deliver_batch.app.producer_or_acquire() as producer:
+            for chunk in chunks:
+                deliver_batch.apply_async(
+                    args=(batch.integration_id, [data_pk for _, data_pk, _ in chunk]),
+                    producer=producer,
+                )
+        get_queryset(PendingDelivery).filter(
+            pk__in=[pk for chunk in chunks for pk, *_ in chunk]
+        ).delete()
+    logger.info(
+        f"Flushed {len(chunks)} batches to integration with pk={batch.integration_id}."
+    )
+    return len(chunks)
+
+
+def flush_pending_deliveries(now: Optional[datetime] = None) -> int:
+    now = timezone.now() if now is None else now
+    return sum(
+        flush_batch(batch, now) for batch in get_pending_batches() if batch.is_due(now)
+    )
@@ -0,0 +1,117 @@
+import asyncio
+import dataclasses
+import logging
+from collections.abc import Iterable
+from typing import Optional
+
+import httpx
+
+from scraper.models import Integration
+from scraper.utils.client.client import AsyncHttpClient
+from scraper.utils.client.pool import run_in_event_loop
+
+
+@dataclasses.dataclass(frozen=True)
+class DeliverySettings:
+    max_concurrency: int = 10
+    timeout: float = 30.0
+    payload_cache_timeout: int = 300
+
+    @classmethod
+    def from_settings(cls) -> "DeliverySettings":
+        from django.conf import settings
+
+        options = getattr(settings, "WEBHOOK_DELIVERY", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class Delivery:
+    integration: Integration
+    response: Optional[httpx.Response] = None
+
+    @property
+    def is_success(self) -> bool:
+        return self.response is not None and self.response.is_success
+
+    @property
+    def is_retryable(self) -> bool:
+        # The data rejected by the hook is not sent again, unless the hook asks for it.
+        if self.response is None:
+            return True
+        status_code = self.response.status_code
+        return not self.response.is_client_error or status_code in (408, 429)
+
+
+async def _deliver(
+    client: AsyncHttpClient,
+    integration: Integration,
+    request_kwargs: dict,
+    semaphore: asyncio.Semaphore,
+    timeout: float,
+    logger: logging.Logger,
+) -> Delivery:
+    async with semaphore:
+        try:
+            response = await asyncio.wait_for(
+                client.post(url=integration.hook_url, request_kwargs=request_kwargs),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Delivery to integration with pk={integration.pk} "
+                f"timed out after {timeout} seconds."
+            )
+            response = None
+    return Delivery(integration=integration, response=response)
+
+
+async def _fan_out(
+    integrations: list[Integration],
+    request_kwargs: dict,
+    delivery_settings: DeliverySettings,
+    logger: logging.Logger,
+) -> list[Delivery]:
+    client = AsyncHttpClient(logger=logger)
+    semaphore = asyncio.Semaphore(delivery_settings.max_concurrency)
+    return list(
+        await asyncio.gather(
+            *(
+                _deliver(
+                    client,
+                    integration,
+                    request_kwargs,
+                    semaphore,
+                    delivery_settings.timeout,
+                    logger,
+                )
+                for integration in integrations
+            )
+        )
+    )
+
+
+def deliver_to_integrations(
+    integrations: Iterable[Integration],
+    request_kwargs: dict,
+    logger: logging.Logger,
+    delivery_settings: Optional[DeliverySettings] = None,
+) -> list[Delivery]:
+    # The integrations are evaluated here, the ORM must not be touched inside the event loop.
+    integrations = list(integrations)
+    if not integrations:
+        return []
+    delivery_settings = (
+        DeliverySettings.from_settings()
+        if delivery_settings is None
+        else delivery_settings
+    )
+    return run_in_event_loop(
+        _fan_out(integrations, request_kwargs, delivery_settings, logger)
+    )
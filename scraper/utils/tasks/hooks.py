@@ -3,23 +3,50 @@ from collections.abc import Sequence
 
 import httpx
 
-from scraper.models import ScrapedData, Integration, IntegrationConsumption
-from scraper.utils.models.misc import get_default_manager
-
-
-def add_consumer(scraped_data: ScrapedData, integration: Integration):
-    def response_hook(logger: logging.Logger, response: httpx.Response):
-        if response.is_success:
-            logger.info(
-                f"Sent a {ScrapedData.__qualname__!r} instance with pk={scraped_data.pk}"
-                f" to integration with pk={integration.pk}"
+from scraper.models import ScrapedData, Integration
+from scraper.utils.models.integration_consumption import upsert_consumptions
+from scraper.utils.models.scraped_data import bump_scraped_data_versions
+
+
+class ConsumptionRecorder:
+    def __init__(self):
+        # The pairs of the integration and scraped data pk mapped to
+        # the resource pk and the content hash of the consumed version.
+        self._pending: dict[tuple[int, int], tuple[int, str]] = {}
+        self.written: list[int] = []
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(
+        self, integration: Integration, scraped_data_batch: Sequence[ScrapedData]
+    ):
+        for data in scraped_data_batch:
+            self._pending[(integration.pk, data.pk)] = (
+                data.resource_id,
+                data.content_hash,
             )
-            scraped_data.consumers.add(integration)
-
-    return response_hook
 
-
-def add_consumers(scraped_data_batch: Sequence[ScrapedData], integration: Integration):
+    def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending = dict(self._pending)
+        self._pending.clear()
+        inserted = upsert_consumptions(
+            [(*pair, content_hash) for pair, (_, content_hash) in pending.items()]
+        )
+        if inserted:
+            # The responses filtered by the consumptions become stale.
+            bump_scraped_data_versions({pending[pair][0] for pair in inserted})
+        self.written.append(len(inserted))
+        return len(inserted)
+
+
+def add_consumers(
+    recorder: ConsumptionRecorder,
+    scraped_data_batch: Sequence[ScrapedData],
+    integration: Integration,
+):
 
     scraped_data_pk_list = [data.pk for data in scraped_data_batch]
 
@@ -30,11 +57,6 @@ def add_consumers(scraped_data_batch: Sequence[ScrapedData], integration: Integr
                 f"with pk__in={scraped_data_pk_list} "
                 f"to integration with pk={integration.pk}"
             )
-            get_default_manager(IntegrationConsumption).bulk_create(
-                [
-                    IntegrationConsumption(integration=integration, scraped_data=data)
-                    for data in scraped_data_batch
-                ]
-            )
+            recorder.record(integration, scraped_data_batch)
 
     return response_hook
@@ -0,0 +1,96 @@
+import dataclasses
+import logging
+import time
+from collections.abc import Sequence
+from typing import Optional
+
+from django.db import router, transaction
+from django.db.models import TextField
+from django.db.models.functions import Cast, Length
+
+from scraper.models import DeliveryOutbox, ScrapedData
+from scraper.utils.models.integration import append_to_feed
+from scraper.utils.models.misc import get_default_manager, get_queryset
+from scraper.utils.tasks.batching import (
+    add_pending_deliveries,
+    flush_pending_deliveries,
+)
+
+logger = logging.getLogger("django")
+
+
+@dataclasses.dataclass(frozen=True)
+class OutboxSettings:
+    # The maximal number of the entries drained at once.
+    batch_size: int = 1000
+    # How long the relay sleeps if the outbox is empty, in seconds.
+    poll_interval: float = 1
+
+    @classmethod
+    def from_settings(cls) -> "OutboxSettings":
+        from django.conf import settings
+
+        options = getattr(settings, "DELIVERY_OUTBOX", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+
+def add_to_outbox(scraped_data: Sequence[ScrapedData]) -> int:
+    # Must be called in the transaction storing the scraped data.
+    entries = get_default_manager(DeliveryOutbox).bulk_create(
+        [DeliveryOutbox(scraped_data=data) for data in scraped_data if data.data]
+    )
+    return len(entries)
+
+
+def get_outbox_batch(batch_size: int) -> list[tuple[int, int, int, int]]:
+    # The entries locked by another relay are skipped, so the relays drain
+    # the outbox side by side without waiting for each other.
+    return list(
+        get_queryset(DeliveryOutbox)
+        .select_for_update(skip_locked=True, of=("self",))
+        .order_by("pk")
+        .annotate(size=Length(Cast("scraped_data__data", TextField())))
+        .values_list(
+            "pk", "scraped_data_id", "scraped_data__resource__topic_id", "size"
+        )[:batch_size]
+    )
+
+
+def relay_outbox(settings: Optional[OutboxSettings] = None) -> int:
+    settings = OutboxSettings.from_settings() if settings is None else settings
+    with transaction.atomic(using=router.db_for_write(DeliveryOutbox)):
+        batch = get_outbox_batch(settings.batch_size)
+        if not batch:
+            return 0
+        # The entries are moved to the batches of the integrations,
+        # which are sent once they are full or late enough.
+        add_pending_deliveries(
+            (data_pk, topic_id, size) for _, data_pk, topic_id, size in batch
+        )
+        get_queryset(DeliveryOutbox).filter(pk__in=[pk for pk, *_ in batch]).delete()
+        # Last, since the feed stays locked from then on until the commit.
+        append_to_feed((data_pk, topic_id) for _, data_pk, topic_id, _ in batch)
+    logger.info(f"Relayed {len(batch)} outbox entries.")
+    return len(batch)
+
+
+class OutboxRelay:
+    def __init__(self, settings: Optional[OutboxSettings] = None):
+        self.settings = OutboxSettings.from_settings() if settings is None else settings
+
+    def run_once(self) -> float:
+        relayed = relay_outbox(self.settings)
+        flush_pending_deliveries()
+        # A full batch means there are more entries waiting.
+        return 0 if relayed >= self.settings.batch_size else self.settings.poll_interval
+
+    def run_forever(self):
+        logger.info("Starting the outbox relay.")
+        while True:
+            time.sleep(self.run_once())
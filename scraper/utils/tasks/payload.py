@@ -0,0 +1,85 @@
+import hashlib
+from collections.abc import Sequence
+from typing import Union, Optional
+
+import orjson
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from scraper.api.serializers import ScrapedDataSerializer
+from scraper.models import ScrapedData, Integration
+from scraper.utils.tasks.delivery import DeliverySettings
+
+PAYLOAD_CACHE_KEY_PREFIX = "scraper:payload"
+PAYLOAD_EXPAND = ["resource", "resource.topic"]
+
+
+def _default(obj):
+    return DjangoJSONEncoder().default(obj)
+
+
+def encode_json(data) -> bytes:
+    return orjson.dumps(data, default=_default)
+
+
+def get_batch_fingerprint(scraped_data: Sequence[ScrapedData]) -> str:
+    # The modification times are a part of it, so an updated item is never sent stale.
+    return ",".join(
+        f"{data.pk}:{data.modified.timestamp()}"
+        for data in sorted(scraped_data, key=lambda data: data.pk)
+    )
+
+
+def get_payload_cache_key(scraped_data: Sequence[ScrapedData]) -> str:
+    digest = hashlib.sha1(get_batch_fingerprint(scraped_data).encode()).hexdigest()
+    return f"{PAYLOAD_CACHE_KEY_PREFIX}:{digest}"
+
+
+def get_idempotency_key(
+    integration: Integration, scraped_data: Sequence[ScrapedData]
+) -> str:
+    # A retried delivery is sent with the same key, so the hook can drop it
+    # if it has processed the batch before failing to respond.
+    return hashlib.sha256(
+        f"{integration.pk}|{get_batch_fingerprint(scraped_data)}".encode()
+    ).hexdigest()
+
+
+def render_payload(scraped_data: Union[ScrapedData, Sequence[ScrapedData]]) -> bytes:
+    if isinstance(scraped_data, ScrapedData):
+        return encode_json(
+            ScrapedDataSerializer(instance=scraped_data, expand=PAYLOAD_EXPAND).data
+        )
+    return encode_json(
+        ScrapedDataSerializer(scraped_data, many=True, expand=PAYLOAD_EXPAND).data
+    )
+
+
+def build_payload(
+    scraped_data: Union[ScrapedData, Sequence[ScrapedData]],
+    delivery_settings: Optional[DeliverySettings] = None,
+) -> bytes:
+    delivery_settings = (
+        DeliverySettings.from_settings()
+        if delivery_settings is None
+        else delivery_settings
+    )
+    batch = (scraped_data,) if isinstance(scraped_data, ScrapedData) else scraped_data
+    # A single item and a batch of one are encoded differently.
+    key = get_payload_cache_key(batch) + (
+        ":single" if isinstance(scraped_data, ScrapedData) else ""
+    )
+    payload = cache.get(key)
+    if payload is None:
+        payload = render_payload(scraped_data)
+        cache.set(key, payload, timeout=delivery_settings.payload_cache_timeout)
+    return payload
+
+
+def get_payload_request_kwargs(
+    payload: bytes, idempotency_key: Optional[str] = None
+) -> dict:
+    headers = {"Content-Type": "application/json"}
+    if idempotency_key is not None:
+        headers["Idempotency-Key"] = idempotency_key
+    return {"content": payload, "headers": headers}
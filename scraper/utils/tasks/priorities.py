@@ -0,0 +1,94 @@
+import dataclasses
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+from celery import current_app
+from kombu.exceptions import ChannelError
+
+from scraper.models import Resource
+
+PriorityChoices = Resource.PriorityChoices
+
+# The workers consume these queues in turn (round robin), a queue is never starved,
+# the lower priorities get fewer steps since they are postponed while the grid is saturated.
+PRIORITY_QUEUES: dict[int, str] = {
+    PriorityChoices.HIGH: "scraping.high",
+    PriorityChoices.MODERATE: "scraping.moderate",
+    PriorityChoices.LOW: "scraping.low",
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class PrioritySettings:
+    # The number of the higher priority steps waiting in the queues
+    # from which the grid is considered saturated.
+    saturation_threshold: int = 3
+    slowdown_factors: dict = dataclasses.field(
+        default_factory=lambda: {"LOW": 4, "MODERATE": 2, "HIGH": 1}
+    )
+    # For how many seconds the depths of the queues are reused.
+    depths_max_age: float = 5
+
+    @classmethod
+    def from_settings(cls) -> "PrioritySettings":
+        from django.conf import settings
+
+        options = getattr(settings, "SCRAPING_PRIORITY", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+    def get_slowdown_factor(self, priority: int) -> float:
+        return self.slowdown_factors.get(PriorityChoices(priority).name, 1)
+
+
+def get_priority_queue(priority: int) -> str:
+    return PRIORITY_QUEUES[PriorityChoices(priority)]
+
+
+_depths: Optional[tuple[float, dict[str, int]]] = None
+_depths_lock = threading.Lock()
+
+
+def get_queue_depths(max_age: float = 0) -> dict[str, int]:
+    global _depths
+
+    with _depths_lock:
+        if _depths is not None and time.monotonic() - _depths[0] < max_age:
+            return _depths[1]
+        depths = {}
+        # The connection comes from the pool of the app, the broker is not dialled each time.
+        with current_app.pool.acquire(block=True) as connection:
+            channel = connection.default_channel
+            for queue in PRIORITY_QUEUES.values():
+                try:
+                    depths[queue] = channel.queue_declare(
+                        queue=queue, passive=True
+                    ).message_count
+                except ChannelError:
+                    depths[queue] = 0
+        _depths = (time.monotonic(), depths)
+        return depths
+
+
+def get_priority_countdown(
+    countdown: timedelta, priority: int, settings: Optional[PrioritySettings] = None
+) -> timedelta:
+    # The lower priority steps are postponed while the higher priority ones are queued,
+    # the high priority resources keep their cadence.
+    settings = PrioritySettings.from_settings() if settings is None else settings
+    depths = get_queue_depths(max_age=settings.depths_max_age)
+    waiting = sum(
+        depths[queue]
+        for queue_priority, queue in PRIORITY_QUEUES.items()
+        if queue_priority > priority
+    )
+    if waiting < settings.saturation_threshold:
+        return countdown
+    return countdown * settings.get_slowdown_factor(priority)
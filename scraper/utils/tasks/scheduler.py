@@ -0,0 +1,250 @@
+import dataclasses
+import heapq
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from scraper.models import ScraperConfiguration, Resource
+from scraper.scrapers import get_from_registry
+from scraper.utils.models.misc import get_queryset, get_default_manager
+from scraper.utils.tasks.priorities import get_priority_queue, get_priority_countdown
+
+logger = logging.getLogger("django")
+
+LEADER_KEY = "scraper:scheduler:leader"
+
+# Takes the leadership if nobody holds it, or renews it for its holder, atomically.
+ELECT_SCRIPT = """
+local holder = redis.call("GET", KEYS[1])
+if not holder then
+    redis.call("SET", KEYS[1], ARGV[1], "PX", ARGV[2])
+    return 1
+end
+if holder == ARGV[1] then
+    redis.call("PEXPIRE", KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+RESIGN_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class SchedulerSettings:
+    # How often the due times are reloaded from the database, in seconds.
+    refresh_interval: float = 10
+    # The maximal number of the steps released at once.
+    batch_size: int = 100
+    # How long the leadership lasts unless it is renewed, in seconds.
+    lease_timeout: float = 30
+    # The longest sleep between two releases, in seconds.
+    tick: float = 1
+    # The url of the Redis shared by the schedulers, which elect their leader in it.
+    location: Optional[str] = None
+    # For how long a released step which has not started yet blocks the next one.
+    release_timeout: float = 15 * 60
+
+    @classmethod
+    def from_settings(cls) -> "SchedulerSettings":
+        from django.conf import settings
+
+        options = getattr(settings, "SCRAPING_SCHEDULER", {})
+        return cls(
+            **{
+                field.name: options[field.name.upper()]
+                for field in dataclasses.fields(cls)
+                if field.name.upper() in options
+            }
+        )
+
+
+def get_active_configurations():
+    return get_queryset(ScraperConfiguration).filter(
+        status=ScraperConfiguration.ACTIVE_STATUS,
+        resource__status=Resource.ACTIVE_STATUS,
+    )
+
+
+def schedule_now(configurations):
+    return configurations.update(next_run_at=timezone.now())
+
+
+def get_busy_configurations(now: datetime, release_timeout: float):
+    # The previous step is either still waiting in a queue, or running under its lease.
+    return get_queryset(ScraperConfiguration).filter(
+        Q(released_at__gt=now - timedelta(seconds=release_timeout))
+        | Q(lease_expires_at__gt=now)
+    )
+
+
+class LeaderLease:
+    def __init__(self, location: str, key: str = LEADER_KEY):
+        import redis
+
+        self.key = key
+        self._client = redis.Redis.from_url(location)
+        self._elect = self._client.register_script(ELECT_SCRIPT)
+        self._resign = self._client.register_script(RESIGN_SCRIPT)
+
+    def elect(self, node_id: str, timeout: float) -> bool:
+        return bool(self._elect(keys=[self.key], args=[node_id, int(timeout * 1000)]))
+
+    def resign(self, node_id: str):
+        self._resign(keys=[self.key], args=[node_id])
+
+
+class ScrapingScheduler:
+    def __init__(
+        self,
+        settings: Optional[SchedulerSettings] = None,
+        node_id: Optional[str] = None,
+        lease: Optional[LeaderLease] = None,
+    ):
+        self.settings = (
+            SchedulerSettings.from_settings() if settings is None else settings
+        )
+        if lease is None:
+            if self.settings.location is None:
+                # A cache of a single process would make every scheduler the leader.
+                raise ImproperlyConfigured(
+                    "The schedulers need a shared Redis to elect their leader, "
+                    "set the LOCATION of SCRAPING_SCHEDULER."
+                )
+            lease = LeaderLease(self.settings.location)
+        self.lease = lease
+        self.node_id = uuid.uuid4().hex if node_id is None else node_id
+        self._heap: list[tuple[datetime, str]] = []
+        self._refreshed_at: Optional[float] = None
+        self._is_leader = False
+
+    def elect(self) -> bool:
+        # The leadership expires unless it is renewed, the node holding it renews it.
+        is_leader = self.lease.elect(self.node_id, self.settings.lease_timeout)
+        if is_leader != self._is_leader:
+            logger.info(
+                f"Scheduler {self.node_id} has "
+                f"{'become' if is_leader else 'stopped being'} the leader."
+            )
+            # A new leader must not trust the due times it has seen before.
+            self._refreshed_at = None
+        self._is_leader = is_leader
+        return is_leader
+
+    def resign(self):
+        self.lease.resign(self.node_id)
+        self._is_leader = False
+
+    def refresh(self):
+        now = timezone.now()
+        self._heap = [
+            (next_run_at or now, scraper_name)
+            for scraper_name, next_run_at in get_active_configurations().values_list(
+                "scraper_name", "next_run_at"
+            )
+        ]
+        heapq.heapify(self._heap)
+        self._refreshed_at = time.monotonic()
+
+    def __pop_due(self, now: datetime) -> list[str]:
+        due = []
+        while (
+            self._heap
+            and self._heap[0][0] <= now
+            and len(due) < self.settings.batch_size
+        ):
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def release_due(self) -> int:
+        from scraper.tasks import scrape_data
+
+        now = timezone.now()
+        due = self.__pop_due(now)
+        if not due:
+            return 0
+        # The configurations are read again, they could have been stopped since the refresh.
+        configurations = list(
+            get_active_configurations()
+            .filter(scraper_name__in=due)
+            .select_related("resource")
+        )
+        busy = set(
+            get_busy_configurations(now, self.settings.release_timeout)
+            .filter(scraper_name__in=due)
+            .values_list("scraper_name", flat=True)
+        )
+        for scraper_name in busy:
+            # Retried later, without moving the due time, so no step is piled up.
+            heapq.heappush(
+                self._heap,
+                (now + timedelta(seconds=self.settings.refresh_interval), scraper_name),
+            )
+        configurations = [
+            configuration
+            for configuration in configurations
+            if configuration.scraper_name not in busy
+        ]
+        countdowns: dict[tuple[timedelta, int], timedelta] = {}
+        # The release is saved before the steps are published, otherwise a fast worker
+        # could start a step whose lease would be hidden by the release saved after it.
+        with transaction.atomic():
+            for configuration in configurations:
+                priority = configuration.resource.priority
+                scraper_cls = get_from_registry(configuration.scraper_name)
+                key = (scraper_cls.scrape_data_countdown, priority)
+                if key not in countdowns:
+                    countdowns[key] = get_priority_countdown(*key)
+                configuration.next_run_at = now + countdowns[key]
+                configuration.released_at = now
+                scrape_data.apply_async_on_commit(
+                    args=(configuration.scraper_name,),
+                    queue=get_priority_queue(priority),
+                )
+            get_default_manager(ScraperConfiguration).bulk_update(
+                configurations, ["next_run_at", "released_at"]
+            )
+        for configuration in configurations:
+            heapq.heappush(
+                self._heap, (configuration.next_run_at, configuration.scraper_name)
+            )
+        logger.info(f"Scheduler {self.node_id} released {len(configurations)} steps.")
+        return len(configurations)
+
+    def __get_sleep_time(self) -> float:
+        sleep_time = self.settings.tick
+        if self._heap:
+            until_due = (self._heap[0][0] - timezone.now()).total_seconds()
+            sleep_time = min(sleep_time, max(until_due, 0))
+        return sleep_time
+
+    def run_once(self) -> float:
+        if not self.elect():
+            return self.settings.lease_timeout / 3
+        if (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at >= self.settings.refresh_interval
+        ):
+            self.refresh()
+        self.release_due()
+        return self.__get_sleep_time()
+
+    def run_forever(self):
+        logger.info(f"Starting scheduler {self.node_id}.")
+        try:
+            while True:
+                time.sleep(self.run_once())
+        finally:
+            self.resign()
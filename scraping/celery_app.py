@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_shutdown
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "scraping.settings.dev")
@@ -20,3 +21,17 @@ app.autodiscover_tasks()
 @app.task(bind=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")
+
+
+@worker_process_shutdown.connect
+def close_http_client_pools(**kwargs):
+    from scraper.utils.client.pool import close_client_pools
+
+    close_client_pools()
+
+
+@worker_process_shutdown.connect
+def close_remote_driver_pools(**kwargs):
+    from scraper.utils.scrapers.pool import close_driver_pools
+
+    close_driver_pools()
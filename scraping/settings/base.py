@@ -42,8 +42,10 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "drf_yasg",
     "rest_framework",
+    "django_filters",
 ] + PROJECT_APPS
 
 MIDDLEWARE = [
@@ -123,7 +125,143 @@ REST_FRAMEWORK = {
         "rest_framework.throttling.AnonRateThrottle",
         "rest_framework.throttling.UserRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "100/day",
+        "user": "1000/day",
+        "integration_feed": (
+            os.environ.get("DJANGO_INTEGRATION_FEED_THROTTLE_RATE") or "120/min"
+        ),
+    },
+}
+
+# The scraped data API is paginated by the keyset of its rows, the page size
+# requested by a client is capped at the MAX_PAGE_SIZE.
+API_PAGINATION = {
+    "PAGE_SIZE": int(os.environ.get("DJANGO_API_PAGE_SIZE") or 50),
+    "MAX_PAGE_SIZE": int(os.environ.get("DJANGO_API_MAX_PAGE_SIZE") or 500),
+}
+
+# The responses of the scraped data API are cached until the scraped data changes,
+# the TIMEOUT only bounds how long an unused response stays in the cache.
+API_CACHE = {
+    "TIMEOUT": int(os.environ.get("DJANGO_API_CACHE_TIMEOUT") or 300),
+}
+
+# The scraped data export streams the rows read in chunks of the CHUNK_SIZE.
+API_EXPORT = {
+    "CHUNK_SIZE": int(os.environ.get("DJANGO_API_EXPORT_CHUNK_SIZE") or 2000),
+}
+
+# The feed of the pull integrations, a request waits for the new items
+# for up to the MAX_WAIT seconds if it asks to. A waiting request holds a thread
+# of the server and its database connection, so the server needs a thread
+# for every long polling client on top of the other requests.
+INTEGRATION_FEED = {
+    "DEFAULT_LIMIT": int(
+        os.environ.get("DJANGO_INTEGRATION_FEED_DEFAULT_LIMIT") or 100
+    ),
+    "MAX_LIMIT": int(os.environ.get("DJANGO_INTEGRATION_FEED_MAX_LIMIT") or 500),
+    "MAX_WAIT": float(os.environ.get("DJANGO_INTEGRATION_FEED_MAX_WAIT") or 10),
+    "POLL_INTERVAL": float(
+        os.environ.get("DJANGO_INTEGRATION_FEED_POLL_INTERVAL") or 1
+    ),
+}
+
+# HTTP client connection pool, shared by the requests of a worker process.
+HTTP_CLIENT_POOL = {
+    "HTTP2": bool(int(os.environ.get("DJANGO_HTTP_CLIENT_HTTP2") or 0)),
+    "MAX_CONNECTIONS": int(os.environ.get("DJANGO_HTTP_CLIENT_MAX_CONNECTIONS") or 100),
+    "MAX_KEEPALIVE_CONNECTIONS": int(
+        os.environ.get("DJANGO_HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS") or 20
+    ),
+    "MAX_CONNECTIONS_PER_HOST": int(
+        os.environ.get("DJANGO_HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST") or 10
+    ),
+    "KEEPALIVE_EXPIRY": float(
+        os.environ.get("DJANGO_HTTP_CLIENT_KEEPALIVE_EXPIRY") or 30
+    ),
+    "CONNECT_TIMEOUT": float(os.environ.get("DJANGO_HTTP_CLIENT_CONNECT_TIMEOUT") or 5),
+    "READ_TIMEOUT": float(os.environ.get("DJANGO_HTTP_CLIENT_READ_TIMEOUT") or 10),
+    "WRITE_TIMEOUT": float(os.environ.get("DJANGO_HTTP_CLIENT_WRITE_TIMEOUT") or 10),
+    "POOL_TIMEOUT": float(os.environ.get("DJANGO_HTTP_CLIENT_POOL_TIMEOUT") or 5),
+}
+
+# Concurrent delivery of the scraped data to the integrations' hooks.
+WEBHOOK_DELIVERY = {
+    "MAX_CONCURRENCY": int(
+        os.environ.get("DJANGO_WEBHOOK_DELIVERY_MAX_CONCURRENCY") or 10
+    ),
+    "TIMEOUT": float(os.environ.get("DJANGO_WEBHOOK_DELIVERY_TIMEOUT") or 30),
+    "PAYLOAD_CACHE_TIMEOUT": int(
+        os.environ.get("DJANGO_WEBHOOK_DELIVERY_PAYLOAD_CACHE_TIMEOUT") or 300
+    ),
+}
+
+# Browser-free scraping engine.
+STATIC_SCRAPER = {
+    "PARSE_PROCESSES": int(
+        os.environ.get("DJANGO_STATIC_SCRAPER_PARSE_PROCESSES") or 2
+    ),
+    "PROCESS_POOL_THRESHOLD": int(
+        os.environ.get("DJANGO_STATIC_SCRAPER_PROCESS_POOL_THRESHOLD") or 256 * 1024
+    ),
+}
+
+# Slowing down the lower priority resources when the grid is saturated.
+SCRAPING_PRIORITY = {
+    "SATURATION_THRESHOLD": int(
+        os.environ.get("DJANGO_SCRAPING_PRIORITY_SATURATION_THRESHOLD") or 3
+    ),
+    "SLOWDOWN_FACTORS": {"LOW": 4, "MODERATE": 2, "HIGH": 1},
+    "DEPTHS_MAX_AGE": float(
+        os.environ.get("DJANGO_SCRAPING_PRIORITY_DEPTHS_MAX_AGE") or 5
+    ),
+}
+
+SCRAPING_SCHEDULER = {
+    "REFRESH_INTERVAL": float(
+        os.environ.get("DJANGO_SCRAPING_SCHEDULER_REFRESH_INTERVAL") or 10
+    ),
+    "BATCH_SIZE": int(os.environ.get("DJANGO_SCRAPING_SCHEDULER_BATCH_SIZE") or 100),
+    "LEASE_TIMEOUT": float(
+        os.environ.get("DJANGO_SCRAPING_SCHEDULER_LEASE_TIMEOUT") or 30
+    ),
+    "TICK": float(os.environ.get("DJANGO_SCRAPING_SCHEDULER_TICK") or 1),
+    # The schedulers elect their leader in a Redis shared by all of them.
+    "LOCATION": os.environ.get("DJANGO_SCRAPING_SCHEDULER_LOCATION"),
+    "RELEASE_TIMEOUT": float(
+        os.environ.get("DJANGO_SCRAPING_SCHEDULER_RELEASE_TIMEOUT") or 15 * 60
+    ),
+}
+
+# The relay drains the outbox of the scraped data in batches, and sends them to
+# the integrations once their batches are full or late, see the batch limits
+# of the integrations.
+DELIVERY_OUTBOX = {
+    "BATCH_SIZE": int(os.environ.get("DJANGO_DELIVERY_OUTBOX_BATCH_SIZE") or 1000),
+    "POLL_INTERVAL": float(os.environ.get("DJANGO_DELIVERY_OUTBOX_POLL_INTERVAL") or 1),
+}
+
+SCRAPING_RATE_LIMITER = {
+    # The in-memory backend limits the requests of a single process only.
+    "BACKEND": "scraper.utils.scrapers.ratelimit.InMemoryRateLimiterBackend",
+    "OPTIONS": {},
+    # The requests per second to a domain, used if neither the domain nor the resource
+    # has a rate limit. The domains are not limited if it is None.
+    "DEFAULT_RATE": None,
+    "DOMAINS": {
+        "olx.pl": {
+            "RATE": float(os.environ.get("DJANGO_SCRAPING_OLX_RATE_LIMIT") or 1),
+            "BURST": int(os.environ.get("DJANGO_SCRAPING_OLX_RATE_LIMIT_BURST") or 5),
+        },
+    },
+}
+
+SCRAPED_DATA_ARCHIVE = {
+    "DIRECTORY": os.environ.get("DJANGO_SCRAPED_DATA_ARCHIVE_DIRECTORY")
+    or os.path.join(BASE_DIR, "archive"),
+    "CHUNK_SIZE": int(os.environ.get("DJANGO_SCRAPED_DATA_ARCHIVE_CHUNK_SIZE") or 2000),
+    "PART_SIZE": int(os.environ.get("DJANGO_SCRAPED_DATA_ARCHIVE_PART_SIZE") or 10000),
 }
 
 # Internationalization
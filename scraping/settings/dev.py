@@ -24,16 +24,40 @@ CACHES = {
     }
 }
 
+SCRAPING_RATE_LIMITER = SCRAPING_RATE_LIMITER | {
+    "BACKEND": "scraper.utils.scrapers.ratelimit.RedisRateLimiterBackend",
+    "OPTIONS": {"location": f"redis://{REDIS_HOST}:{REDIS_PORT}/"},
+}
+
+SCRAPING_SCHEDULER = SCRAPING_SCHEDULER | {
+    "LOCATION": (
+        SCRAPING_SCHEDULER["LOCATION"] or f"redis://{REDIS_HOST}:{REDIS_PORT}/"
+    ),
+}
+
 CELERY_BROKER_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}"
 CELERY_RESULT_BACKEND = f"redis://{REDIS_HOST}:{REDIS_PORT}"
 CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_SERIALIZER = "json"
 CELERYD_MAX_TASKS_PER_CHILD = 4
+# The queues given to the worker with -Q are consumed in turn, so the low priority queue
+# is never starved, the higher priorities are favoured by postponing the lower ones,
+# see scraper.utils.tasks.priorities.
+CELERY_BROKER_TRANSPORT_OPTIONS = {"queue_order_strategy": "round_robin"}
 CELERYD_MAX_MEMORY_PER_CHILD = 4000
 
 SELENIUM_GRID_HOST = os.environ.get("DJANGO_SELENIUM_GRID_HOST", "localhost")
 SELENIUM_GRID_PORT = os.environ.get("DJANGO_SELENIUM_GRID_PORT", 4444)
 SELENIUM_HUB_URL = f"http://{SELENIUM_GRID_HOST}:{SELENIUM_GRID_PORT}/wd/hub"
+SELENIUM_DRIVER_POOL = {
+    # The pool is kept by every worker process, the sessions of all of them
+    # are limited by MAX_SESSIONS, which must not exceed the sessions of the grid.
+    "MAX_SIZE": int(os.environ.get("DJANGO_SELENIUM_DRIVER_POOL_MAX_SIZE") or 1),
+    "MAX_SESSIONS": int(os.environ.get("DJANGO_SELENIUM_NODE_MAX_SESSION") or 3),
+    "MAX_IDLE": int(os.environ.get("DJANGO_SELENIUM_DRIVER_MAX_IDLE") or 60),
+    "MAX_USES": int(os.environ.get("DJANGO_SELENIUM_DRIVER_MAX_USES") or 50),
+    "MAX_AGE": int(os.environ.get("DJANGO_SELENIUM_DRIVER_MAX_AGE") or 30 * 60),
+}
 
 SHELL_PLUS = "ipython"
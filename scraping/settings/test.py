@@ -0,0 +1,13 @@
+from scraping.settings.dev import *
+
+# The tests run against the Postgres of the dev settings, without Redis.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+SCRAPING_RATE_LIMITER = SCRAPING_RATE_LIMITER | {
+    "BACKEND": "scraper.utils.scrapers.ratelimit.InMemoryRateLimiterBackend",
+    "OPTIONS": {},
+}